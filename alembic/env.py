@@ -18,6 +18,7 @@ from app.core.config.settings import settings
 from app.core.db.base import Base
 # Import all models here so they are registered in metadata
 from app.modules.user.user_model import User  # noqa
+from app.modules.notification.outbox_model import OutboxMessage  # noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
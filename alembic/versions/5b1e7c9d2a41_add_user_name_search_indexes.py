@@ -0,0 +1,36 @@
+"""Add user name search indexes
+
+Revision ID: 5b1e7c9d2a41
+Revises: dd975554af04
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c9d2a41'
+down_revision: Union[str, Sequence[str], None] = 'dd975554af04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Prefix search (both databases): range scan on lower(name)
+    op.create_index('ix_users_name_lower', 'users', [sa.text('lower(name)')])
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Substring/fuzzy search: trigram GIN index for ILIKE '%q%' and %
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.execute('CREATE INDEX ix_users_name_trgm ON users USING gin (lower(name) gin_trgm_ops)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_users_name_trgm')
+    op.drop_index('ix_users_name_lower', table_name='users')
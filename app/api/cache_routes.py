@@ -1,28 +1,54 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional, Any
 from app.core.service_factory import ServiceFactory
 from app.core.dependencies import get_service_factory
+from app.core.cache.stats import cache_stats
 
 router = APIRouter()
 
 @router.get("/", summary="Get cache value or list keys")
 async def get_cache(
-    key: Optional[str] = Query(None, description="Cache key to retrieve. If omitted, lists all keys."),
+    key: Optional[str] = Query(None, description="Cache key to retrieve. If omitted, lists keys."),
+    pattern: str = Query("*", description="Glob-style pattern used when listing keys"),
+    cursor: int = Query(0, ge=0, description="Cursor returned by the previous page (0 starts a new listing)"),
+    count: int = Query(100, ge=1, le=1000, description="Keys to examine per page (a hint, not a limit)"),
+    stream: bool = Query(False, description="Stream every matching key as NDJSON instead of one page"),
     factory: ServiceFactory = Depends(get_service_factory)
 ):
     """
     Retrieve a value from the cache by key.
-    If no key is provided, returns a list of all cache keys.
+
+    If no key is provided, lists keys matching `pattern` one SCAN page at a
+    time. Pass the returned `cursor` back to get the next page; a cursor of
+    0 means the listing is complete. With `stream=true` all matching keys
+    are streamed as NDJSON, one `{"key": ...}` object per line.
     """
     if key:
         value = await factory.cache.get(key)
         if value is None:
             raise HTTPException(status_code=404, detail="Cache key not found")
         return {"key": key, "value": value}
-    
-    # List all keys if no key provided
-    keys = await factory.cache.list_keys()
-    return {"keys": keys}
+
+    if stream:
+        async def ndjson():
+            async for k in factory.cache.scan_keys(pattern, count=count):
+                yield json.dumps({"key": k}) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    next_cursor, keys = await factory.cache.scan_page(cursor, pattern, count)
+    return {"keys": keys, "cursor": next_cursor}
+
+
+@router.get("/stats", summary="Cache statistics")
+async def get_cache_stats():
+    """
+    Hit/miss counts, hit ratios, Redis latency and payload size histograms
+    for this worker, overall and per key prefix (e.g. `users:*`).
+    """
+    return cache_stats.snapshot()
 
 
 @router.delete("/{key}", summary="Delete a cache key")
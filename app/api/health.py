@@ -5,14 +5,17 @@ Enhanced health check endpoints with connectivity checks and version info.
 from fastapi import APIRouter, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import asyncio
 import rich
 from sqlalchemy import text
 
-from app.core.db.session import AsyncSessionLocal
-from app.core.cache.redis import redis_client
+from app.core.db.session import AsyncSessionLocal, pool_snapshot, replicas_snapshot
+from app.core.cache import backend as cache_backend
+from app.core.cache import redis
 from app.core.config.settings import settings
+from app.core.logging.logger import log_queue_stats
+from app.modules.notification.services import notification_service
 
 router = APIRouter()
 
@@ -29,6 +32,7 @@ class ReadinessStatus(BaseModel):
     """Readiness check response model."""
     ready: bool
     checks: Dict[str, bool]
+    details: Optional[Dict[str, Any]] = None
 
 
 async def check_database() -> bool:
@@ -46,9 +50,9 @@ async def check_database() -> bool:
 async def check_redis() -> bool:
     """Check Redis connectivity."""
     try:
-        if not settings.redis_enabled or not redis_client:
+        if not settings.redis_enabled or not redis.redis_client:
             return True  # Not enabled, so "healthy"
-        await redis_client.ping()
+        await asyncio.wait_for(redis.redis_client.ping(), settings.cache_op_timeout)
         return True
     except Exception as e:
         rich.print("Redis connection failed", e)
@@ -67,7 +71,8 @@ async def health_check():
         environment="development" if settings.debug else "production",
         details={
             "app_name": settings.app_name,
-            "redis_enabled": settings.redis_enabled
+            "redis_enabled": settings.redis_enabled,
+            "cache_backend": cache_backend.backend.name if cache_backend.backend else None
         }
     )
 
@@ -87,6 +92,10 @@ async def readiness_check():
     Readiness probe for Kubernetes/Docker.
     Returns 200 if application is ready to serve traffic.
     Checks database and Redis connectivity.
+
+    Only the database gates readiness: without Redis the cache degrades
+    (its circuit breaker opens) and requests are served from the database,
+    so the Redis check and breaker state are reported but don't fail the probe.
     """
     # Run checks concurrently
     db_check, redis_check = await asyncio.gather(
@@ -99,13 +108,20 @@ async def readiness_check():
     db_healthy = db_check if isinstance(db_check, bool) else False
     redis_healthy = redis_check if isinstance(redis_check, bool) else False
     
-    all_ready = db_healthy and redis_healthy
+    all_ready = db_healthy
     
     response = ReadinessStatus(
         ready=all_ready,
         checks={
             "database": db_healthy,
             "redis": redis_healthy if settings.redis_enabled else True
+        },
+        details={
+            "cache_circuit": cache_backend.breaker_snapshot(),
+            "db_pool": pool_snapshot(),
+            "db_replicas": replicas_snapshot(),
+            "log_queue": log_queue_stats(),
+            "notifications": notification_service.notification_stats(),
         }
     )
     
@@ -9,6 +9,8 @@ from typing import Optional
 from app.modules.user.user_routes import router as user_router
 from app.core.logging import log_reader
 from app.core.logging.schemas import LogResponse
+from app.core.db.session import pool_snapshot
+from app.modules.notification.outbox_dispatcher import outbox_snapshot
 
 api_router = APIRouter()
 
@@ -48,3 +50,27 @@ async def get_log_stats():
     Returns information about current and rotated log files for each level.
     """
     return log_reader.get_log_stats()
+
+
+@api_router.get("/db/pool", tags=["System"])
+async def get_db_pool_stats():
+    """
+    Get connection pool statistics for this worker.
+    
+    Returns pool size/overflow, checked-out connections (current and peak),
+    checkout wait-time histogram and timeouts since startup, for the
+    primary and (under "replicas") each read replica's own pool.
+    """
+    return pool_snapshot()
+
+
+@api_router.get("/outbox/stats", tags=["System"])
+async def get_outbox_stats():
+    """
+    Get notification outbox statistics for this worker's dispatcher.
+    
+    Returns delivered/retried/failed counters, throughput over the last
+    minute, write-to-delivery lag percentiles, and the backlog in the table
+    (pending messages, age of the oldest). null when the dispatcher is off.
+    """
+    return await outbox_snapshot()
@@ -1,5 +1,15 @@
-from app.core.cache.redis import init_redis, redis_client
+import asyncio
+
+from app.core.cache import redis
+from app.core.cache.redis import init_redis
+from app.core.cache.backend import init_cache_backend, close_cache_backend
+from app.core.cache.local_cache import init_local_cache
+from app.core.cache.invalidation import start_invalidation_listener, stop_invalidation_listener
 from app.core.db.session import init_db, close_db
+from app.core.logging.logger import flush_logs
+from app.modules.user.user_repository import init_user_write_coalescer, close_user_write_coalescer
+from app.modules.notification.services.notification_service import init_notification_limits
+from app.modules.notification.outbox_dispatcher import init_outbox_dispatcher, close_outbox_dispatcher
 
 
 async def bootstrap():
@@ -12,9 +22,25 @@ async def bootstrap():
     # Initialize DB first so failures prevent app from starting
     await init_db()
 
+    # Opt-in batching of concurrent user inserts
+    init_user_write_coalescer()
+
     # Then initialize Redis (optional service)
     await init_redis()
 
+    # Cache storage: Redis, or in-memory when Redis is disabled
+    init_cache_backend()
+
+    # Optional L1 cache, kept coherent across workers via Redis pub/sub
+    init_local_cache()
+    await start_invalidation_listener()
+
+    # Provider rate limits for notifications
+    init_notification_limits()
+
+    # Delivers notifications committed to the outbox table
+    init_outbox_dispatcher()
+
 
 async def shutdown():
     """Shutdown/cleanup for all centralized services.
@@ -22,10 +48,19 @@ async def shutdown():
     Closes Redis (if initialized) and disposes database engine/pools.
     Safe to call multiple times.
     """
+    # Write out queued inserts before the engine goes away
+    await close_user_write_coalescer()
+
+    # Finish the current outbox batch; the rest stays in the table
+    await close_outbox_dispatcher()
+
+    await stop_invalidation_listener()
+    await close_cache_backend()
+
     # Close Redis if available
     try:
-        if redis_client:
-            await redis_client.close()
+        if redis.redis_client:
+            await redis.redis_client.close()
             print("✅ Redis connection closed.")
     except Exception as e:
         print(f"⚠️ Error closing Redis: {e}")
@@ -35,3 +70,7 @@ async def shutdown():
         close_db()
     except Exception as e:
         print(f"⚠️ Error disposing DB engine: {e}")
+
+    # Last: everything logged above is written out before the process exits
+    if not await asyncio.to_thread(flush_logs):
+        print("⚠️ Log queue not fully flushed on shutdown.")
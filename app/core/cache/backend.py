@@ -0,0 +1,272 @@
+"""
+Storage backends behind CacheService.
+
+CacheService deals in serialized payloads; a backend only stores bytes
+with expiries. Writes are queued on a batch and sent together, so every
+backend can honour the one-round-trip guarantees of `CacheService.pipeline`.
+
+- RedisBackend: shared by all workers (the default when Redis is enabled)
+- MemoryBackend: per process, for single-node deployments and tests
+  (see memory_backend.py)
+
+Remote backends are wrapped in GuardedBackend, which puts a timeout on
+every call and a circuit breaker in front of the backend.
+"""
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+
+from app.core.cache import redis
+from app.core.cache.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.config.settings import settings
+
+BACKENDS = ("auto", "redis", "memory", "none")
+
+# Deletes the key only if it still holds the expected value (e.g. a lock
+# that may have expired and been taken by another process in the meantime).
+DELETE_IF_EQUALS_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class CacheBatch(ABC):
+    """Writes queued for a single round trip."""
+
+    @abstractmethod
+    def set(self, key: str, payload: bytes, ttl: int): ...
+
+    @abstractmethod
+    def delete(self, *keys: str): ...
+
+    @abstractmethod
+    def incr(self, key: str): ...
+
+    @abstractmethod
+    def publish(self, channel: str, message: str): ...
+
+    @abstractmethod
+    async def execute(self): ...
+
+
+class CacheBackend(ABC):
+    """Byte storage with expiry, as used by CacheService."""
+
+    name: str
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]: ...
+
+    @abstractmethod
+    def batch(self) -> CacheBatch: ...
+
+    @abstractmethod
+    async def set_nx(self, key: str, value: str, ttl_ms: int) -> bool:
+        """Set `key` only if it doesn't exist; True if it was set."""
+
+    @abstractmethod
+    async def delete_if_equals(self, key: str, value: str) -> bool:
+        """Delete `key` only if it holds `value`."""
+
+    @abstractmethod
+    async def scan(self, cursor: int, pattern: str, count: int) -> Tuple[int, List[str]]:
+        """One step of a cursor-based key listing; a next cursor of 0 means done."""
+
+    @abstractmethod
+    def scan_iter(self, pattern: str, count: int) -> AsyncIterator[str]: ...
+
+    async def close(self):
+        pass
+
+
+class RedisBatch(CacheBatch):
+    def __init__(self, client):
+        self._pipe = client.pipeline(transaction=False)
+
+    def set(self, key: str, payload: bytes, ttl: int):
+        self._pipe.set(key, payload, ex=ttl)
+
+    def delete(self, *keys: str):
+        self._pipe.delete(*keys)
+
+    def incr(self, key: str):
+        self._pipe.incr(key)
+
+    def publish(self, channel: str, message: str):
+        self._pipe.publish(channel, message)
+
+    async def execute(self):
+        await self._pipe.execute()
+
+
+class RedisBackend(CacheBackend):
+    name = "redis"
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return await self.client.mget(keys)
+
+    def batch(self) -> CacheBatch:
+        return RedisBatch(self.client)
+
+    async def set_nx(self, key: str, value: str, ttl_ms: int) -> bool:
+        return bool(await self.client.set(key, value, nx=True, px=ttl_ms))
+
+    async def delete_if_equals(self, key: str, value: str) -> bool:
+        return bool(await self.client.eval(DELETE_IF_EQUALS_SCRIPT, 1, key, value))
+
+    async def scan(self, cursor: int, pattern: str, count: int) -> Tuple[int, List[str]]:
+        next_cursor, keys = await self.client.scan(cursor=cursor, match=pattern, count=count)
+        return int(next_cursor), [key.decode() for key in keys]
+
+    async def scan_iter(self, pattern: str, count: int) -> AsyncIterator[str]:
+        async for key in self.client.scan_iter(match=pattern, count=count):
+            yield key.decode()
+
+
+class GuardedBatch(CacheBatch):
+    def __init__(self, inner: CacheBatch, guarded: "GuardedBackend"):
+        self._inner = inner
+        self._guarded = guarded
+
+    def set(self, key: str, payload: bytes, ttl: int):
+        self._inner.set(key, payload, ttl)
+
+    def delete(self, *keys: str):
+        self._inner.delete(*keys)
+
+    def incr(self, key: str):
+        self._inner.incr(key)
+
+    def publish(self, channel: str, message: str):
+        self._inner.publish(channel, message)
+
+    async def execute(self):
+        await self._guarded.call(self._inner.execute())
+
+
+class GuardedBackend(CacheBackend):
+    """
+    Wraps a backend with per-call timeouts and a circuit breaker.
+
+    Calls raise CircuitOpenError without touching the backend while the
+    circuit is open; CacheService treats that like any other failure (a
+    miss for reads, a skipped write) so callers fall through to their loaders.
+    """
+
+    def __init__(self, inner: CacheBackend, breaker: CircuitBreaker, timeout: float):
+        self.inner = inner
+        self.breaker = breaker
+        self.timeout = timeout
+        self.name = inner.name
+
+    async def call(self, operation):
+        if not self.breaker.allow():
+            operation.close()  # never awaited; avoid the "never awaited" warning
+            raise CircuitOpenError(f"Cache circuit '{self.breaker.name}' is open")
+
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(operation, self.timeout)
+        except asyncio.TimeoutError:
+            self.breaker.record_failure(f"timeout after {self.timeout}s")
+            raise
+        except Exception as e:
+            self.breaker.record_failure(f"{type(e).__name__}: {e}")
+            raise
+        except BaseException:
+            # Cancelled (e.g. the client went away): no verdict on the backend
+            self.breaker.release()
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        return result
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.call(self.inner.get(key))
+
+    async def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return await self.call(self.inner.mget(keys))
+
+    def batch(self) -> CacheBatch:
+        return GuardedBatch(self.inner.batch(), self)
+
+    async def set_nx(self, key: str, value: str, ttl_ms: int) -> bool:
+        return await self.call(self.inner.set_nx(key, value, ttl_ms))
+
+    async def delete_if_equals(self, key: str, value: str) -> bool:
+        return await self.call(self.inner.delete_if_equals(key, value))
+
+    async def scan(self, cursor: int, pattern: str, count: int) -> Tuple[int, List[str]]:
+        return await self.call(self.inner.scan(cursor, pattern, count))
+
+    async def scan_iter(self, pattern: str, count: int) -> AsyncIterator[str]:
+        # Step by step so each SCAN call gets its own timeout
+        cursor = 0
+        while True:
+            cursor, keys = await self.scan(cursor, pattern, count)
+            for key in keys:
+                yield key
+            if cursor == 0:
+                break
+
+    async def close(self):
+        await self.inner.close()
+
+
+backend: Optional[CacheBackend] = None
+
+
+def init_cache_backend():
+    """
+    Pick the cache backend from settings.
+
+    "auto" uses Redis when it is enabled and the in-memory backend
+    otherwise; "none" disables caching (every CacheService call is a no-op).
+    """
+    global backend
+    choice = settings.cache_backend
+
+    if choice in ("auto", "redis") and redis.redis_client:
+        backend = GuardedBackend(
+            RedisBackend(redis.redis_client),
+            CircuitBreaker(
+                "redis",
+                failure_threshold=settings.cache_breaker_failure_threshold,
+                reset_timeout=settings.cache_breaker_reset_timeout,
+                slow_call_threshold=settings.cache_slow_call_threshold,
+            ),
+            timeout=settings.cache_op_timeout,
+        )
+    elif choice in ("auto", "memory"):
+        from app.core.cache.memory_backend import MemoryBackend
+        backend = MemoryBackend(
+            max_bytes=settings.cache_memory_max_bytes,
+            max_items=settings.cache_memory_max_items,
+        )
+    else:
+        backend = None
+
+
+async def close_cache_backend():
+    global backend
+    if backend is not None:
+        await backend.close()
+        backend = None
+
+
+def breaker_snapshot() -> Optional[dict]:
+    """State of the cache circuit breaker, if the backend has one."""
+    breaker = getattr(backend, "breaker", None)
+    return breaker.snapshot() if breaker else None
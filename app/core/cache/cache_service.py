@@ -1,49 +1,365 @@
-import json
-from typing import Any, Optional, List, Union
-from pydantic import BaseModel
-from app.core.cache import redis
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple, Union
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from app.core.cache import backend as cache_backend, local_cache, invalidation
+from app.core.cache.serializers import get_serializer
+from app.core.cache.keys import generation_key, tagged_key
+from app.core.cache.stats import cache_stats
+from app.core.cache.circuit_breaker import CircuitOpenError
+from app.core.logging.logger import add_to_log
+
+def to_cacheable(value: Any) -> Any:
+    """Convert Pydantic models (or lists of them) to plain, codec-safe data."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, list):
+        # Handle list of Pydantic models or dicts
+        return [v.model_dump(mode="json") if isinstance(v, BaseModel) else v for v in value]
+    return value
+
+
+def _failed(key: str, error: Exception):
+    """
+    Account for a failed backend call.
+
+    The cache is an optimization: callers carry on as if it missed (reads)
+    or skip the write. Calls refused by an open circuit are expected while
+    the backend is down and aren't logged one by one.
+    """
+    if isinstance(error, CircuitOpenError):
+        return
+    cache_stats.record_error(key)
+    add_to_log("error", f"Cache operation failed for '{key}': {type(error).__name__}: {error}", show_in_terminal=False)
+
+
+def _validators(adapter: TypeAdapter):
+    """Decoders for `get_as`-style reads; values that don't fit become misses."""
+    def from_backend(raw):
+        try:
+            return get_serializer().loads_as(raw, adapter)
+        except ValidationError:
+            return None
+
+    def from_l1(value):
+        try:
+            # Already-validated models pass through without re-validation
+            return adapter.validate_python(value)
+        except ValidationError:
+            return None
+
+    return from_backend, from_l1
+
 
 class CacheService:
     def __init__(self, ttl: int = 300):
         self.default_ttl = ttl
 
     async def get(self, key: str) -> Optional[Any]:
-        """Retrieve a value from the cache."""
-        if not redis.redis_client:
+        """Retrieve a value from the cache (L1 first, then Redis)."""
+        return await self._get(key, get_serializer().loads, lambda value: value)
+
+    async def get_as(self, key: str, adapter: TypeAdapter) -> Optional[Any]:
+        """
+        Retrieve a value already validated as the type of `adapter`.
+
+        Redis payloads are validated straight from bytes (no intermediate
+        dicts for JSON codecs). An entry that no longer fits the type is
+        treated as a miss.
+        """
+        from_backend, from_l1 = _validators(adapter)
+        return await self._get(key, from_backend, from_l1)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Retrieve several values with one MGET; misses come back as None."""
+        return await self._get_many(keys, get_serializer().loads, lambda value: value)
+
+    async def get_many_as(self, keys: List[str], adapter: TypeAdapter) -> List[Optional[Any]]:
+        """Like `get_many`, validating each value as in `get_as`."""
+        from_backend, from_l1 = _validators(adapter)
+        return await self._get_many(keys, from_backend, from_l1)
+
+    async def _get(self, key: str, from_backend, from_l1) -> Optional[Any]:
+        backend = cache_backend.backend
+        if backend is None:
             return None
-        
-        value = await redis.redis_client.get(key)
-        if value:
-            return json.loads(value)
-        return None
+
+        l1 = local_cache.local_cache
+        if l1 is not None:
+            value = l1.get(key)
+            if value is not None:
+                value = from_l1(value)
+            if value is not None:
+                cache_stats.record_get(key, hit=True, l1=True)
+                return value
+            epoch = l1.epoch
+
+        started = time.perf_counter()
+        try:
+            raw = await backend.get(key)
+        except Exception as e:
+            _failed(key, e)
+            return None
+        elapsed = time.perf_counter() - started
+
+        value = from_backend(raw) if raw else None
+        cache_stats.record_get(key, hit=value is not None, seconds=elapsed, size=len(raw) if raw else None)
+        if value is not None and l1 is not None:
+            l1.set(key, value, epoch=epoch)
+        return value
+
+    async def _get_many(self, keys: List[str], from_backend, from_l1) -> List[Optional[Any]]:
+        backend = cache_backend.backend
+        if backend is None or not keys:
+            return [None] * len(keys)
+
+        l1 = local_cache.local_cache
+        values: List[Optional[Any]] = [None] * len(keys)
+        if l1 is not None:
+            epoch = l1.epoch
+            for i, key in enumerate(keys):
+                value = l1.get(key)
+                if value is not None:
+                    values[i] = from_l1(value)
+                    if values[i] is not None:
+                        cache_stats.record_get(key, hit=True, l1=True)
+
+        missing = [i for i, v in enumerate(values) if v is None]
+        if not missing:
+            return values
+
+        started = time.perf_counter()
+        try:
+            raws = await backend.mget([keys[i] for i in missing])
+        except Exception as e:
+            _failed(keys[missing[0]], e)
+            return values
+        # One round trip for the batch: its latency is counted once
+        elapsed = time.perf_counter() - started
+
+        for n, (i, raw) in enumerate(zip(missing, raws)):
+            if raw:
+                values[i] = from_backend(raw)
+                if l1 is not None and values[i] is not None:
+                    l1.set(keys[i], values[i], epoch=epoch)
+            cache_stats.record_get(
+                keys[i],
+                hit=values[i] is not None,
+                seconds=elapsed if n == 0 else None,
+                size=len(raw) if raw else None,
+            )
+        return values
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None):
         """Set a value in the cache with serialization."""
-        if not redis.redis_client:
-            return
-        
-        # Handle Pydantic models
-        if isinstance(value, BaseModel):
-            value = value.model_dump()
-        elif isinstance(value, list):
-            # Handle list of Pydantic models or dicts
-            value = [v.model_dump() if isinstance(v, BaseModel) else v for v in value]
-        
-        json_value = json.dumps(value, default=str)
-        await redis.redis_client.set(key, json_value, ex=ttl or self.default_ttl)
+        async with self.pipeline() as pipe:
+            pipe.set(key, value, ttl)
+
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """
+        Set several values in one round trip.
+
+        Unlike MSET, every key gets its own expiry: one SET ... EX per key,
+        sent as a single pipeline.
+        """
+        async with self.pipeline() as pipe:
+            for key, value in items.items():
+                pipe.set(key, value, ttl)
 
     async def delete(self, key: str):
         """Delete a value from the cache."""
-        if not redis.redis_client:
+        async with self.pipeline() as pipe:
+            pipe.delete(key)
+
+    async def delete_many(self, keys: List[str]):
+        """Delete several values with a single DEL."""
+        async with self.pipeline() as pipe:
+            pipe.delete(*keys)
+
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator["CachePipeline"]:
+        """
+        Batch cache writes into one Redis round trip.
+
+            async with cache.pipeline() as pipe:
+                pipe.set("a", 1)
+                pipe.delete("b")
+
+        Everything queued is sent when the block exits without an error.
+        """
+        pipe = CachePipeline(self.default_ttl)
+        yield pipe
+        await pipe.execute()
+
+    async def get_generations(self, tags: List[str]) -> List[int]:
+        """Current generation of each tag (0 if never invalidated)."""
+        keys = [generation_key(tag) for tag in tags]
+        values = await self._get_many(keys, int, lambda value: value)
+        return [value or 0 for value in values]
+
+    async def tagged_key(self, key: str, tags: List[str]) -> str:
+        """`key` with the current generations of `tags` embedded."""
+        if not tags:
+            return key
+        return tagged_key(key, await self.get_generations(tags))
+
+    async def invalidate_tags(self, *tags: str):
+        """
+        Orphan every key cached under any of `tags`.
+
+        One INCR per tag, regardless of how many keys were derived from it.
+        Generation counters never expire, so a tag can't fall back to an
+        old generation whose keys might still be cached.
+        """
+        backend = cache_backend.backend
+        if backend is None or not tags:
             return
-        
-        await redis.redis_client.delete(key)
+
+        keys = [generation_key(tag) for tag in tags]
+        l1 = local_cache.local_cache
+        if l1 is not None:
+            l1.delete(keys)
+
+        batch = backend.batch()
+        for key in keys:
+            batch.incr(key)
+        if l1 is not None:
+            invalidation.publish_keys(batch, keys)
+        try:
+            await batch.execute()
+        except Exception as e:
+            # Keys of this tag may be served stale until they expire
+            _failed(keys[0], e)
 
     async def list_keys(self, pattern: str = "*") -> List[str]:
-        """List keys matching a pattern."""
-        if not redis.redis_client:
-            return []
-        
-        # Keys returns strings directly due to decode_responses=True
-        keys = await redis.redis_client.keys(pattern)
-        return keys
+        """
+        List keys matching a pattern.
+
+        Uses SCAN so Redis is never blocked, but still collects every match;
+        prefer `scan_keys` or `scan_page` for large keyspaces.
+        """
+        return [key async for key in self.scan_keys(pattern)]
+
+    async def scan_keys(self, pattern: str = "*", count: int = 100) -> AsyncIterator[str]:
+        """Iterate over keys matching a pattern, `count` keys per SCAN call (a hint)."""
+        backend = cache_backend.backend
+        if backend is None:
+            return
+
+        try:
+            async for key in backend.scan_iter(pattern, count):
+                yield key
+        except Exception as e:
+            _failed(pattern, e)
+
+    async def scan_page(self, cursor: int = 0, pattern: str = "*", count: int = 100) -> Tuple[int, List[str]]:
+        """
+        Run a single SCAN step.
+
+        Returns the next cursor and the keys found; a next cursor of 0 means
+        the iteration is complete. A step may return fewer (even zero) keys
+        than `count` without being the last one.
+        """
+        backend = cache_backend.backend
+        if backend is None:
+            return 0, []
+
+        try:
+            return await backend.scan(cursor, pattern, count)
+        except Exception as e:
+            _failed(pattern, e)
+            return 0, []
+
+    async def acquire_lock(self, key: str, timeout: float) -> Optional[str]:
+        """
+        Try to take a short-lived distributed lock named after `key`.
+
+        Returns a token to pass to `release_lock`, or None if another process
+        holds the lock. Without Redis there is nothing to coordinate with, so
+        the lock is always granted.
+        """
+        backend = cache_backend.backend
+        if backend is None:
+            return ""
+
+        token = uuid.uuid4().hex
+        try:
+            acquired = await backend.set_nx("lock:" + key, token, max(1, int(timeout * 1000)))
+        except Exception as e:
+            # Can't coordinate; let the caller load on its own
+            _failed(key, e)
+            return ""
+        return token if acquired else None
+
+    async def release_lock(self, key: str, token: str):
+        """Release a lock taken with `acquire_lock`."""
+        backend = cache_backend.backend
+        if backend is None or not token:
+            return
+
+        try:
+            await backend.delete_if_equals("lock:" + key, token)
+        except Exception as e:
+            # The lock expires on its own
+            _failed(key, e)
+
+
+class CachePipeline:
+    """Cache writes queued by `CacheService.pipeline()`."""
+
+    def __init__(self, default_ttl: int):
+        self.default_ttl = default_ttl
+        self._sets: List[Tuple[str, bytes, int]] = []
+        self._deletes: List[str] = []
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Queue a serialized SET with its own expiry."""
+        payload = get_serializer().dumps(to_cacheable(value))
+        self._sets.append((key, payload, ttl or self.default_ttl))
+
+    def delete(self, *keys: str):
+        """Queue keys for deletion."""
+        self._deletes.extend(keys)
+
+    async def execute(self):
+        """Send everything queued in one round trip."""
+        backend = cache_backend.backend
+        if backend is None or not (self._sets or self._deletes):
+            return
+
+        l1 = local_cache.local_cache
+        if l1 is not None and self._deletes:
+            l1.delete(self._deletes)
+
+        batch = backend.batch()
+        for key, payload, ttl in self._sets:
+            batch.set(key, payload, ttl)
+        if self._deletes:
+            batch.delete(*self._deletes)
+        if l1 is not None:
+            invalidation.publish_keys(batch, [k for k, _, _ in self._sets] + self._deletes)
+
+        started = time.perf_counter()
+        try:
+            await batch.execute()
+        except Exception as e:
+            _failed(self._sets[0][0] if self._sets else self._deletes[0], e)
+            self._sets.clear()
+            self._deletes.clear()
+            return
+        elapsed = time.perf_counter() - started
+
+        for n, (key, payload, _) in enumerate(self._sets):
+            cache_stats.record_set(key, len(payload), seconds=elapsed if n == 0 else None)
+        for key in self._deletes:
+            cache_stats.record_delete(key)
+
+        if l1 is not None:
+            serializer = get_serializer()
+            for key, payload, ttl in self._sets:
+                # Store the round-tripped value so L1 and Redis hits look the same
+                l1.set(key, serializer.loads(payload), ttl=ttl)
+
+        self._sets.clear()
+        self._deletes.clear()
@@ -0,0 +1,109 @@
+"""
+Circuit breaker for the cache backend.
+
+closed     calls go through; consecutive failures (errors, timeouts or
+           calls slower than the slow-call threshold) are counted
+open       after `failure_threshold` of them, calls are refused outright
+           for `reset_timeout` seconds, so the cache costs nothing while
+           it is down and callers go straight to their loaders
+half_open  after the cool-down a single probe call is let through; success
+           closes the circuit, failure opens it for another cool-down
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        slow_call_threshold: Optional[float] = None,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.slow_call_threshold = slow_call_threshold
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+        # Lifetime counters for the readiness/details report
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self.last_failure: Optional[str] = None
+        self.last_state_change = datetime.now(timezone.utc)
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (may move open -> half_open)."""
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        self.rejected_calls += 1
+        return False
+
+    def record_success(self, elapsed: float):
+        if self.slow_call_threshold is not None and elapsed > self.slow_call_threshold:
+            self.record_failure(f"slow call ({elapsed * 1000:.1f} ms)")
+            return
+
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def release(self):
+        """
+        Give back a call's slot without an outcome (the call was cancelled).
+
+        A cancelled half-open probe says nothing about the backend, but the
+        slot must be freed or the circuit would stay half-open for good.
+        """
+        self._probe_in_flight = False
+
+    def record_failure(self, reason: str):
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        self.last_failure = reason
+
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.opened_at = time.monotonic()
+            self.times_opened += 1
+            self._transition(OPEN)
+
+    def _transition(self, state: str):
+        self.state = state
+        self.last_state_change = datetime.now(timezone.utc)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls,
+            "last_failure": self.last_failure,
+            "last_state_change": self.last_state_change.isoformat(),
+        }
@@ -0,0 +1,118 @@
+"""
+Cross-worker invalidation of the L1 cache over Redis pub/sub.
+
+Every worker subscribes to one channel. Writes and deletes publish the
+affected keys, and each subscriber drops them from its own L1 cache.
+"""
+
+import asyncio
+import json
+import uuid
+from typing import Iterable, List, Optional
+
+from app.core.cache import backend, local_cache, redis
+from app.core.cache.local_cache import LocalCache
+from app.core.config.settings import settings
+from app.core.logging.logger import add_to_log
+
+
+class CacheInvalidator:
+    """Publishes and consumes L1 invalidation messages for one worker."""
+
+    def __init__(self, channel: str, cache: LocalCache):
+        self.channel = channel
+        self.cache = cache
+        # Lets a worker ignore its own messages; it already updated its L1.
+        self.origin = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    def message(self, keys: Iterable[str]) -> str:
+        """Build the payload published for `keys`."""
+        return json.dumps({"origin": self.origin, "keys": list(keys)})
+
+    def handle(self, data: str):
+        """Apply a received payload to the local L1 cache."""
+        try:
+            payload = json.loads(data)
+        except (TypeError, ValueError):
+            return
+
+        if payload.get("origin") == self.origin:
+            return
+        self.cache.delete(payload.get("keys", []))
+
+    def start(self, client):
+        """Start listening in a background task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(client))
+
+    async def stop(self):
+        """Stop the background listener."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _listen(self, client):
+        backoff = 0.5
+        while True:
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Messages may have been missed while disconnected.
+                self.cache.clear()
+                backoff = 0.5
+
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.handle(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                add_to_log("error", f"Cache invalidation listener failed: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+invalidator: Optional[CacheInvalidator] = None
+# The listener's own connection; see redis.pubsub_client
+_listener_client = None
+
+
+async def start_invalidation_listener():
+    """Subscribe this worker to L1 invalidations (requires L1 and the Redis backend)."""
+    global invalidator, _listener_client
+    if local_cache.local_cache is None or not redis.redis_client:
+        return
+    if backend.backend is None or backend.backend.name != "redis":
+        return
+
+    invalidator = CacheInvalidator(settings.cache_invalidation_channel, local_cache.local_cache)
+    # Publishing goes through the cache client; subscribing needs its own
+    _listener_client = redis.pubsub_client()
+    invalidator.start(_listener_client)
+
+
+async def stop_invalidation_listener():
+    global invalidator, _listener_client
+    if invalidator is not None:
+        await invalidator.stop()
+        invalidator = None
+    if _listener_client is not None:
+        await _listener_client.aclose()
+        _listener_client = None
+
+
+def publish_keys(pipe, keys: List[str]):
+    """Queue an invalidation for `keys` on a Redis pipeline, if L1 is active."""
+    if invalidator is not None and keys:
+        pipe.publish(invalidator.channel, invalidator.message(keys))
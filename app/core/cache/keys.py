@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Optional, Sequence
 
 class CacheKeys(str, Enum):
     """
@@ -6,8 +7,33 @@ class CacheKeys(str, Enum):
     Using Enum for type safety and discovery.
     """
     USER_LIST = "users:list"
-    
-    # Example for dynamic keys
-    # @staticmethod
-    # def user_detail(user_id: int) -> str:
-    #     return f"users:detail:{user_id}"
+
+    @staticmethod
+    def user_detail(user_id: int) -> str:
+        return f"users:detail:{user_id}"
+
+    @staticmethod
+    def user_page(limit: int, cursor: Optional[str] = None) -> str:
+        """One page of the user list (see app/core/pagination.py)."""
+        return f"users:list:{limit}:{cursor or 'first'}"
+
+
+class CacheTags(str, Enum):
+    """
+    Invalidation namespaces.
+
+    Keys cached with a tag embed the tag's current generation, so bumping
+    the generation (one INCR) orphans every key derived from it, however
+    many variants exist; the orphans age out through their TTL.
+    """
+    USERS = "users"
+
+
+def generation_key(tag: str) -> str:
+    """Redis key holding the generation counter of `tag`."""
+    return "gen:" + tag
+
+
+def tagged_key(key: str, generations: Sequence[int]) -> str:
+    """Embed tag generations in a key, e.g. 'users:list' -> 'users:list:v3'."""
+    return key + ":v" + ".".join(str(g) for g in generations)
@@ -0,0 +1,82 @@
+"""
+In-process L1 cache that sits in front of Redis.
+
+Entries are bounded by count and by TTL and evicted in LRU order.
+The cache lives per worker process, so it must only ever hold values
+that are safe to share between requests (treat them as read-only).
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Iterable, Optional, Tuple
+
+from app.core.config.settings import settings
+
+
+class LocalCache:
+    """Bounded LRU cache with per-entry expiry."""
+
+    def __init__(self, max_items: int = 1024, ttl: float = 5.0):
+        self.max_items = max(1, max_items)
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Bumped on every invalidation; see `set(..., epoch=...)`
+        self.epoch = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a live entry (refreshing its LRU position) or None."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, epoch: Optional[int] = None):
+        """
+        Store a value.
+
+        If `epoch` is given and an invalidation happened since it was read,
+        the write is dropped so a value fetched before an invalidation can
+        never be re-inserted after it.
+        """
+        if epoch is not None and epoch != self.epoch:
+            return
+
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_items:
+            self._data.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]):
+        """Drop the given keys."""
+        self.epoch += 1
+        for key in keys:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        self.epoch += 1
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+local_cache: Optional[LocalCache] = None
+
+
+def init_local_cache():
+    global local_cache
+    if settings.cache_l1_enabled:
+        local_cache = LocalCache(
+            max_items=settings.cache_l1_max_items,
+            ttl=settings.cache_l1_ttl,
+        )
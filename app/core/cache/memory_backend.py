@@ -0,0 +1,158 @@
+"""
+In-process cache backend.
+
+Stores serialized payloads per worker process with TTLs, LRU eviction and
+a memory cap, so caching works without Redis. Values are kept as bytes,
+exactly as Redis would hold them, so callers never share mutable objects.
+
+Every operation runs synchronously on the event loop thread without
+awaiting in between, so coroutines can't interleave inside one (batches
+included). Keys without a TTL (tag generation counters) are never evicted:
+losing one would let a tag fall back to an older generation.
+"""
+
+import fnmatch
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+
+from app.core.cache.backend import CacheBackend, CacheBatch
+
+# Rough per-entry bookkeeping overhead counted against the memory cap
+ENTRY_OVERHEAD = 64
+
+
+class MemoryBatch(CacheBatch):
+    def __init__(self, backend: "MemoryBackend"):
+        self._backend = backend
+        self._ops = []
+
+    def set(self, key: str, payload: bytes, ttl: int):
+        self._ops.append((self._backend._set, (key, payload, ttl)))
+
+    def delete(self, *keys: str):
+        self._ops.append((self._backend._delete, keys))
+
+    def incr(self, key: str):
+        self._ops.append((self._backend._incr, (key,)))
+
+    def publish(self, channel: str, message: str):
+        # Single process: there is nobody else to notify
+        pass
+
+    async def execute(self):
+        for op, args in self._ops:
+            op(*args)
+        self._ops.clear()
+
+
+class MemoryBackend(CacheBackend):
+    name = "memory"
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_items: int = 100_000):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        # key -> (expires_at or None, payload)
+        self._data: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self.used_bytes = 0
+
+    # -- reads ---------------------------------------------------------
+
+    def _live(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._discard(key)
+            return None
+        self._data.move_to_end(key)
+        return payload
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    async def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        return [self._live(key) for key in keys]
+
+    # -- writes --------------------------------------------------------
+
+    def batch(self) -> CacheBatch:
+        return MemoryBatch(self)
+
+    def _store(self, key: str, payload: bytes, expires_at: Optional[float]):
+        self._discard(key)
+        self._data[key] = (expires_at, payload)
+        self.used_bytes += len(key) + len(payload) + ENTRY_OVERHEAD
+        self._evict()
+
+    def _set(self, key: str, payload: bytes, ttl: int):
+        self._store(key, payload, time.monotonic() + ttl)
+
+    def _delete(self, *keys: str):
+        for key in keys:
+            self._discard(key)
+
+    def _incr(self, key: str) -> int:
+        current = self._live(key)
+        value = int(current) + 1 if current is not None else 1
+        expires_at = self._data[key][0] if current is not None else None
+        self._store(key, str(value).encode(), expires_at)
+        return value
+
+    def _discard(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.used_bytes -= len(key) + len(entry[1]) + ENTRY_OVERHEAD
+
+    def _evict(self):
+        if self.used_bytes <= self.max_bytes and len(self._data) <= self.max_items:
+            return
+
+        for key in list(self._data):
+            if self.used_bytes <= self.max_bytes and len(self._data) <= self.max_items:
+                break
+            # Least recently used first; entries without a TTL are kept
+            if self._data[key][0] is not None:
+                self._discard(key)
+
+    async def set_nx(self, key: str, value: str, ttl_ms: int) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._store(key, value.encode(), time.monotonic() + ttl_ms / 1000)
+        return True
+
+    async def delete_if_equals(self, key: str, value: str) -> bool:
+        if self._live(key) != value.encode():
+            return False
+        self._discard(key)
+        return True
+
+    # -- listing -------------------------------------------------------
+
+    async def scan(self, cursor: int, pattern: str, count: int) -> Tuple[int, List[str]]:
+        # The cursor is a position in insertion/LRU order; like SCAN, keys
+        # written or touched during an iteration may be seen twice or not at all.
+        keys = list(self._data)[cursor:cursor + count]
+        next_cursor = cursor + len(keys)
+        if next_cursor >= len(self._data):
+            next_cursor = 0
+        now = time.monotonic()
+        return next_cursor, [
+            key for key in keys
+            if fnmatch.fnmatchcase(key, pattern)
+            and (self._data[key][0] is None or self._data[key][0] > now)
+        ]
+
+    async def scan_iter(self, pattern: str, count: int) -> AsyncIterator[str]:
+        cursor = 0
+        while True:
+            cursor, keys = await self.scan(cursor, pattern, count)
+            for key in keys:
+                yield key
+            if cursor == 0:
+                break
+
+    async def close(self):
+        self._data.clear()
+        self.used_bytes = 0
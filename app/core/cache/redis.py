@@ -7,14 +7,31 @@ async def init_redis():
     global redis_client
     if settings.redis_enabled:
         try:
+            # Raw bytes: cache payloads are binary (see serializers.py)
             redis_client = redis.from_url(
-                settings.redis_url, 
-                encoding="utf-8", 
-                decode_responses=True
+                settings.redis_url,
+                socket_timeout=settings.cache_op_timeout,
+                socket_connect_timeout=settings.cache_op_timeout,
             )
             # Verify connection
             await redis_client.ping()
             print("✅ Redis connection established successfully.")
         except Exception as e:
-            print(f"❌ Failed to connect to Redis: {e}")
-            raise e
+            # Not fatal: the cache circuit breaker keeps calls away from
+            # Redis until it comes back, and requests go to the database.
+            print(f"⚠️ Redis is not reachable, starting with the cache degraded: {e}")
+
+
+def pubsub_client():
+    """
+    A separate client for long-lived pub/sub subscriptions.
+
+    A subscriber's reads block until a message arrives, so it can't share
+    the cache client's short socket timeout (redis-py 5 raises on it).
+    Idle connections are pinged instead, to notice a dead server.
+    """
+    return redis.from_url(
+        settings.redis_url,
+        socket_connect_timeout=settings.cache_op_timeout,
+        health_check_interval=30,
+    )
@@ -0,0 +1,155 @@
+"""
+Encoding of cache payloads.
+
+Every payload starts with one header byte recording how it was written:
+
+    bits 0-1  codec        (1 = json, 2 = orjson, 3 = msgpack)
+    bits 2-3  compression  (0 = none, 1 = zlib, 2 = lz4)
+
+Header values stay below 0x20, so payloads written before the header
+existed (plain JSON text, which always starts with a printable character)
+are still readable. Readers decode whatever the header says, so the codec
+can be changed without flushing Redis.
+
+orjson, msgpack and lz4 are optional and imported only when used.
+"""
+
+import json
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pydantic import TypeAdapter
+
+from app.core.config.settings import settings
+
+CODECS = ("json", "orjson", "msgpack")
+COMPRESSIONS = ("none", "zlib", "lz4")
+
+_CODEC_IDS = {"json": 1, "orjson": 2, "msgpack": 3}
+_COMPRESSION_IDS = {"none": 0, "zlib": 1, "lz4": 2}
+
+# Codecs whose output `TypeAdapter.validate_json` can parse directly
+_JSON_CODEC_IDS = {_CODEC_IDS["json"], _CODEC_IDS["orjson"]}
+
+
+def _require(module: str):
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError as e:
+        raise ValueError(f"Cache serializer needs '{module}', which is not installed") from e
+
+
+def _codec(name: str) -> Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]:
+    if name == "json":
+        return (
+            lambda v: json.dumps(v, default=str, separators=(",", ":")).encode(),
+            json.loads,
+        )
+    if name == "orjson":
+        orjson = _require("orjson")
+        return (lambda v: orjson.dumps(v, default=str), orjson.loads)
+    if name == "msgpack":
+        msgpack = _require("msgpack")
+        return (
+            lambda v: msgpack.packb(v, default=str, use_bin_type=True),
+            lambda b: msgpack.unpackb(b, raw=False),
+        )
+    raise ValueError(f"Unknown cache codec: {name}")
+
+
+def _compression(name: str) -> Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    if name == "none":
+        return (lambda b: b, lambda b: b)
+    if name == "zlib":
+        return (lambda b: zlib.compress(b, 1), zlib.decompress)
+    if name == "lz4":
+        lz4_frame = _require("lz4.frame")
+        return (lz4_frame.compress, lz4_frame.decompress)
+    raise ValueError(f"Unknown cache compression: {name}")
+
+
+class CacheSerializer:
+    """Encodes values with the configured codec, compressing large payloads."""
+
+    def __init__(self, codec: str = "json", compression: str = "none", compress_threshold: int = 1024):
+        self.codec = codec
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+
+        self._dumps, _ = _codec(codec)
+        self._compress, _ = _compression(compression)
+        self._codec_id = _CODEC_IDS[codec]
+        self._compression_id = _COMPRESSION_IDS[compression]
+
+        # Decoders for every format we might read back, loaded on first use
+        self._loads: Dict[int, Callable[[bytes], Any]] = {}
+        self._decompress: Dict[int, Callable[[bytes], bytes]] = {}
+
+    def dumps(self, value: Any) -> bytes:
+        """Encode a value, prefixed with its header byte."""
+        body = self._dumps(value)
+        compression_id = 0
+        if self._compression_id and len(body) >= self.compress_threshold:
+            body = self._compress(body)
+            compression_id = self._compression_id
+        return bytes((self._codec_id | compression_id << 2,)) + body
+
+    def loads(self, data: bytes) -> Any:
+        """Decode a payload written by any codec."""
+        codec_id, body = self._unwrap(data)
+        return self._loader(codec_id)(body)
+
+    def loads_as(self, data: bytes, adapter: TypeAdapter) -> Any:
+        """
+        Decode a payload straight into the type of `adapter`.
+
+        JSON payloads are validated from bytes by pydantic-core, skipping
+        the intermediate dicts; other codecs decode first.
+        """
+        codec_id, body = self._unwrap(data)
+        if codec_id in _JSON_CODEC_IDS:
+            return adapter.validate_json(body)
+        return adapter.validate_python(self._loader(codec_id)(body))
+
+    def _unwrap(self, data: bytes) -> Tuple[int, bytes]:
+        if isinstance(data, str):
+            data = data.encode()
+        if not data or data[0] >= 0x20:
+            # Legacy payload: plain stdlib JSON without a header
+            return _CODEC_IDS["json"], data
+
+        header = data[0]
+        codec_id, compression_id = header & 0x03, header >> 2
+        body = data[1:]
+        if compression_id:
+            body = self._decompressor(compression_id)(body)
+        return codec_id, body
+
+    def _loader(self, codec_id: int) -> Callable[[bytes], Any]:
+        loads = self._loads.get(codec_id)
+        if loads is None:
+            name = next(n for n, i in _CODEC_IDS.items() if i == codec_id)
+            loads = self._loads[codec_id] = _codec(name)[1]
+        return loads
+
+    def _decompressor(self, compression_id: int) -> Callable[[bytes], bytes]:
+        decompress = self._decompress.get(compression_id)
+        if decompress is None:
+            name = next(n for n, i in _COMPRESSION_IDS.items() if i == compression_id)
+            decompress = self._decompress[compression_id] = _compression(name)[1]
+        return decompress
+
+
+_serializer: Optional[CacheSerializer] = None
+
+
+def get_serializer() -> CacheSerializer:
+    """Return the process-wide serializer built from settings."""
+    global _serializer
+    if _serializer is None:
+        _serializer = CacheSerializer(
+            codec=settings.cache_codec,
+            compression=settings.cache_compression,
+            compress_threshold=settings.cache_compress_threshold,
+        )
+    return _serializer
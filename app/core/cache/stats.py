@@ -0,0 +1,157 @@
+"""
+Cache instrumentation.
+
+Counters and fixed-bucket histograms per key prefix ("users:*"). Recording
+is a dict lookup plus a few integer increments, with no locks (all calls
+come from the event loop thread), so it is cheap enough to leave on.
+"""
+
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Sequence
+
+from app.core.config.settings import settings
+
+# Redis round-trip latency, in milliseconds
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+# Payload size, in bytes
+SIZE_BUCKETS = (128, 512, 2_048, 8_192, 32_768, 131_072, 524_288, 2_097_152)
+
+# Beyond this many distinct prefixes everything is counted under "other:*",
+# so badly shaped keys can't grow the stats without bound.
+MAX_PREFIXES = 200
+
+
+def key_prefix(key: str) -> str:
+    """Group a key by its first segment: 'users:detail:1' -> 'users:*'."""
+    head, sep, _ = key.partition(":")
+    return head + ":*" if sep else key
+
+
+class Histogram:
+    """Fixed-bucket histogram; the last bucket catches everything larger."""
+
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else None,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class PrefixStats:
+    """Counters for one key prefix."""
+
+    __slots__ = ("hits", "l1_hits", "misses", "sets", "deletes", "errors", "latency", "sizes")
+
+    def __init__(self):
+        self.hits = 0
+        self.l1_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.deletes = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS_MS)
+        self.sizes = Histogram(SIZE_BUCKETS)
+
+    def snapshot(self) -> Dict[str, Any]:
+        reads = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "l1_hits": self.l1_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / reads, 4) if reads else None,
+            "sets": self.sets,
+            "deletes": self.deletes,
+            "errors": self.errors,
+            "latency_ms": self.latency.snapshot(),
+            "payload_bytes": self.sizes.snapshot(),
+        }
+
+
+class CacheStats:
+    """Process-wide cache statistics, broken down by key prefix."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self._prefixes: Dict[str, PrefixStats] = {}
+        self.since = datetime.now(timezone.utc)
+
+    def _for(self, key: str) -> PrefixStats:
+        prefix = key_prefix(key)
+        stats = self._prefixes.get(prefix)
+        if stats is None:
+            if len(self._prefixes) >= MAX_PREFIXES:
+                prefix = "other:*"
+                stats = self._prefixes.get(prefix)
+            if stats is None:
+                stats = self._prefixes[prefix] = PrefixStats()
+        return stats
+
+    def record_get(self, key: str, hit: bool, seconds: Optional[float] = None,
+                   size: Optional[int] = None, l1: bool = False):
+        if not self.enabled:
+            return
+        stats = self._for(key)
+        if hit:
+            stats.hits += 1
+            if l1:
+                stats.l1_hits += 1
+        else:
+            stats.misses += 1
+        if seconds is not None:
+            stats.latency.observe(seconds * 1000)
+        if size is not None:
+            stats.sizes.observe(size)
+
+    def record_set(self, key: str, size: int, seconds: Optional[float] = None):
+        if not self.enabled:
+            return
+        stats = self._for(key)
+        stats.sets += 1
+        stats.sizes.observe(size)
+        if seconds is not None:
+            stats.latency.observe(seconds * 1000)
+
+    def record_delete(self, key: str):
+        if self.enabled:
+            self._for(key).deletes += 1
+
+    def record_error(self, key: str):
+        if self.enabled:
+            self._for(key).errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        prefixes = {prefix: stats.snapshot() for prefix, stats in sorted(self._prefixes.items())}
+        totals = {
+            field: sum(p[field] for p in prefixes.values())
+            for field in ("hits", "l1_hits", "misses", "sets", "deletes", "errors")
+        }
+        reads = totals["hits"] + totals["misses"]
+        totals["hit_ratio"] = round(totals["hits"] / reads, 4) if reads else None
+        return {
+            "enabled": self.enabled,
+            "since": self.since.isoformat(),
+            "totals": totals,
+            "prefixes": prefixes,
+        }
+
+
+cache_stats = CacheStats(enabled=settings.cache_stats_enabled)
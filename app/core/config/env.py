@@ -2,6 +2,9 @@
 
 from typing import List
 from app.core.config.settings import settings
+from app.core.cache.backend import BACKENDS
+from app.core.cache.serializers import CODECS, COMPRESSIONS
+from app.core.logging.handlers import OVERFLOW_POLICIES
 from app.core.logging.logger import add_to_log
 
 
@@ -23,10 +26,29 @@ class ConfigValidator:
             errors.append("DATABASE_URL is required")
         elif not settings.database_url.startswith(("postgresql", "sqlite")):
             errors.append("DATABASE_URL must be PostgreSQL or SQLite")
+        for url in filter(None, (u.strip() for u in settings.database_replica_urls.split(","))):
+            if not url.startswith(("postgresql", "sqlite")):
+                errors.append(f"DATABASE_REPLICA_URLS entry must be PostgreSQL or SQLite: {url.split('@')[-1]}")
+        if settings.db_pool_size < 1:
+            errors.append("DB_POOL_SIZE must be at least 1")
+        if settings.db_max_overflow < -1:
+            errors.append("DB_MAX_OVERFLOW must be -1 (unlimited) or more")
+        if settings.db_pool_timeout <= 0:
+            errors.append("DB_POOL_TIMEOUT must be positive")
             
         # Validate Redis settings if enabled
         if settings.redis_enabled and not settings.redis_url:
             errors.append("REDIS_URL is required when REDIS_ENABLED=true")
+
+        # Validate cache backend and encoding
+        if settings.cache_backend not in BACKENDS:
+            errors.append(f"Invalid CACHE_BACKEND: {settings.cache_backend}")
+        if settings.cache_backend == "redis" and not settings.redis_enabled:
+            errors.append("CACHE_BACKEND=redis requires REDIS_ENABLED=true")
+        if settings.cache_codec not in CODECS:
+            errors.append(f"Invalid CACHE_CODEC: {settings.cache_codec}")
+        if settings.cache_compression not in COMPRESSIONS:
+            errors.append(f"Invalid CACHE_COMPRESSION: {settings.cache_compression}")
             
         # Validate log settings
         if not settings.log_dir:
@@ -34,6 +56,14 @@ class ConfigValidator:
             
         if settings.log_level.upper() not in ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]:
             errors.append(f"Invalid LOG_LEVEL: {settings.log_level}")
+        if settings.log_overflow_policy not in OVERFLOW_POLICIES:
+            errors.append(f"Invalid LOG_OVERFLOW_POLICY: {settings.log_overflow_policy}")
+        if settings.log_queue_size < 1:
+            errors.append("LOG_QUEUE_SIZE must be at least 1")
+
+        # Digested outbox emails stay claimed until the digest is sent
+        if settings.notification_digest_window >= settings.outbox_lease_timeout:
+            errors.append("NOTIFICATION_DIGEST_WINDOW must be shorter than OUTBOX_LEASE_TIMEOUT")
             
         if errors:
             error_msg = "Configuration validation failed:\n" + "\n".join(f"  - {e}" for e in errors)
@@ -6,11 +6,99 @@ class Settings(BaseSettings):
 
     database_url: str
 
+    # Comma-separated read replica URLs; declared read-only queries go there
+    database_replica_urls: str = ""
+    # Seconds before a replica that failed to connect is tried again
+    db_replica_retry_after: float = 30.0
+
+    # Connection pool, per worker process (ignored for SQLite)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    # Per-request SQL instrumentation: statements slower than this are logged,
+    # and one statement shape repeated this often in a request is flagged as N+1
+    db_slow_query_ms: float = 200.0
+    db_n_plus_one_threshold: int = 10
+
+    # Batch concurrent single-user inserts into one INSERT ... RETURNING + COMMIT
+    db_write_coalescing: bool = False
+    db_coalesce_max_batch: int = 100
+    db_coalesce_max_delay_ms: float = 5.0
+
+    # asyncpg/SQLAlchemy prepared statement caches; set 0 behind PgBouncer
+    # (transaction mode), which also gives statements unique names
+    db_statement_cache_size: int = 100
+
     redis_enabled: bool = False
     redis_url: str | None = None
 
+    # Cache storage: auto (Redis if enabled, else in-memory), redis, memory or none
+    cache_backend: str = "auto"
+    cache_memory_max_bytes: int = 64 * 1024 * 1024
+    cache_memory_max_items: int = 100_000
+
+    # In-process L1 cache in front of Redis
+    cache_l1_enabled: bool = False
+    cache_l1_max_items: int = 1024
+    cache_l1_ttl: float = 5.0
+    cache_invalidation_channel: str = "cache:invalidate"
+
+    # Cache payload encoding (see app/core/cache/serializers.py)
+    cache_codec: str = "json"
+    cache_compression: str = "none"
+    cache_compress_threshold: int = 1024
+
+    # Hit/miss/latency counters exposed at /api/v1/cache/stats
+    cache_stats_enabled: bool = True
+
+    # Redis cache guards: per-operation timeout (seconds) and circuit breaker.
+    # Calls slower than cache_slow_call_threshold count as failures.
+    cache_op_timeout: float = 0.25
+    cache_slow_call_threshold: float = 0.1
+    cache_breaker_failure_threshold: int = 5
+    cache_breaker_reset_timeout: float = 30.0
+
+    # Seconds before a notification send attempt is abandoned
+    notification_send_timeout: float = 30.0
+    # Provider limits per channel and process: sends per second (0: unlimited),
+    # burst size and concurrent sends
+    notification_email_rate: float = 10.0
+    notification_email_burst: int = 20
+    notification_email_concurrency: int = 5
+    notification_sms_rate: float = 1.0
+    notification_sms_burst: int = 5
+    notification_sms_concurrency: int = 2
+    # Merge emails with the same recipient and subject sent within this many
+    # seconds into one (0: off)
+    notification_digest_window: float = 0.0
+    notification_digest_max_items: int = 100
+
+    # Transactional outbox: notifications are written with the change they
+    # report and delivered by a background dispatcher in every process
+    outbox_dispatcher_enabled: bool = True
+    outbox_batch_size: int = 100
+    outbox_concurrency: int = 10
+    outbox_poll_interval: float = 1.0
+    outbox_max_attempts: int = 5
+    outbox_retry_backoff: float = 1.0
+    outbox_lease_timeout: float = 300.0
+    outbox_retention_hours: float = 24.0
+    # Seconds shutdown waits for the outbox batch being delivered
+    outbox_shutdown_timeout: float = 10.0
+
     log_level: str
     log_dir: str
+    # Log records are queued and written by a background thread. When the
+    # queue is full: drop, block (up to LOG_QUEUE_BLOCK_TIMEOUT seconds) or
+    # sample (keep 1 in LOG_SAMPLE_RATE records below ERROR once half full)
+    log_queue_size: int = 10_000
+    log_overflow_policy: str = "drop"
+    log_queue_block_timeout: float = 1.0
+    log_sample_rate: int = 10
+    # Echo `show_in_terminal` messages to stdout (from the same thread)
+    log_terminal_echo: bool = True
 
     class Config:
         env_file = ".env"
@@ -5,6 +5,9 @@ from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 class Base(DeclarativeBase):
     __abstract__ = True
+    # Fetch server-generated columns (id, timestamps) with RETURNING in the
+    # INSERT/UPDATE itself instead of a later SELECT; see app/core/db/repository.py
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,125 @@
+"""
+Connection pool instrumentation.
+
+Pool events keep a live count of checked-out connections; the pool class
+times how long each checkout takes (waiting for a free connection,
+opening a new one and the pre-ping included) and counts checkouts that
+timed out. Each pool (the primary, every read replica) has its own
+PoolStats, labelled with the pool it counts. Sizing rule of thumb: if `wait_ms` climbs or `timeouts` is
+non-zero while `max_checked_out` sits at size + overflow, the pool is too
+small for the load this worker sees (or connections are held too long).
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.core.cache.stats import Histogram
+
+# Checkout latency, in milliseconds
+WAIT_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class PoolStats:
+    """Process-wide counters for one database connection pool."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait = Histogram(WAIT_BUCKETS_MS)
+        self.since = datetime.now(timezone.utc)
+
+    def attach(self, engine):
+        """Listen to the pool events of `engine` (sync or async)."""
+        target = getattr(engine, "sync_engine", engine)
+        if isinstance(target.pool, InstrumentedQueuePool):
+            target.pool.stats = self
+        event.listen(target, "connect", self._on_connect)
+        event.listen(target, "checkout", self._on_checkout)
+        event.listen(target, "checkin", self._on_checkin)
+        event.listen(target, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.checkouts += 1
+        self.checked_out += 1
+        self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        # Also fired for connections discarded after a failed checkout
+        self.checked_out = max(0, self.checked_out - 1)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.invalidations += 1
+
+    def record_wait(self, seconds: float):
+        self.wait.observe(seconds * 1000)
+
+    def record_timeout(self):
+        self.timeouts += 1
+
+    def snapshot(self, pool: Optional[Pool] = None) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "pool": self.label,
+            "since": self.since.isoformat(),
+            "checked_out": self.checked_out,
+            "max_checked_out": self.max_checked_out,
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "wait_ms": self.wait.snapshot(),
+        }
+        if pool is not None:
+            data["pool_class"] = type(pool).__name__
+            if isinstance(pool, AsyncAdaptedQueuePool):
+                data.update(
+                    size=pool.size(),
+                    max_overflow=pool._max_overflow,
+                    overflow=pool.overflow(),
+                    idle=pool.checkedin(),
+                    timeout=pool.timeout(),
+                )
+        return data
+
+
+# The primary's pool; replicas have their own (see routing.Replica)
+pool_stats = PoolStats("primary")
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout latency and timeouts in the PoolStats attached to its engine."""
+
+    stats: Optional[PoolStats] = None
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def connect(self):
+        stats = self.stats
+        if stats is None:
+            return super().connect()
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            stats.record_timeout()
+            raise
+        finally:
+            stats.record_wait(time.perf_counter() - started)
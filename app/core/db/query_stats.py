@@ -0,0 +1,130 @@
+"""
+Per-request SQL instrumentation.
+
+Engine events time every statement and add it to the `RequestQueryStats`
+of the current request (a context variable the logging middleware sets):
+count, cumulative database time and a fingerprint of each statement's
+shape. The totals end up in the "Request completed" log line.
+
+- Slow statements (over DB_SLOW_QUERY_MS) are logged with the request id.
+- A fingerprint executed DB_N_PLUS_ONE_THRESHOLD times in one request is
+  flagged as a likely N+1 (a query per row instead of one for all rows).
+"""
+
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+
+from app.core.config.settings import settings
+from app.core.logging.logger import add_to_log
+from app.core.logging.middleware import request_id_var
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def fingerprint(statement: str) -> str:
+    """Statement shape: literals and placeholders become '?', IN lists '(?+)'."""
+    shape = _PLACEHOLDERS.sub("?", _WHITESPACE.sub(" ", statement).strip())
+    return _LISTS.sub("(?+)", shape)
+
+
+class RequestQueryStats:
+    """SQL statements sent while serving one request."""
+
+    __slots__ = ("queries", "seconds", "slow", "fingerprints", "n_plus_one")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.slow = 0
+        self.fingerprints: Counter = Counter()
+        self.n_plus_one: list = []
+
+    def record(self, statement: str, seconds: float, executemany: bool = False):
+        self.queries += 1
+        self.seconds += seconds
+        if executemany:
+            # One batched statement, not a loop
+            return
+        shape = fingerprint(statement)
+        self.fingerprints[shape] += 1
+        if self.fingerprints[shape] == settings.db_n_plus_one_threshold:
+            self.n_plus_one.append(shape)
+            add_to_log(
+                "warning",
+                f"[{request_id_var.get()}] Possible N+1: same statement ran {settings.db_n_plus_one_threshold} times",
+                request_id=request_id_var.get(),
+                statement=shape[:1000],
+                show_in_terminal=False,
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "db_queries": self.queries,
+            "db_time_ms": round(self.seconds * 1000, 2),
+            "db_slow_queries": self.slow,
+            "db_n_plus_one": [shape[:200] for shape in self.n_plus_one],
+        }
+
+
+query_stats_var: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_request_stats() -> RequestQueryStats:
+    """Begin collecting statements for the current request."""
+    stats = RequestQueryStats()
+    query_stats_var.set(stats)
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.record(statement, elapsed, executemany)
+
+    if elapsed * 1000 >= settings.db_slow_query_ms:
+        if stats is not None:
+            stats.slow += 1
+        add_to_log(
+            "warning",
+            f"[{request_id_var.get()}] Slow query ({elapsed * 1000:.1f} ms)",
+            request_id=request_id_var.get(),
+            duration_ms=round(elapsed * 1000, 2),
+            statement=statement[:1000],
+            show_in_terminal=False,
+        )
+
+
+def _handle_error(context):
+    # The statement never reached after_cursor_execute; drop its start time
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def attach(engine):
+    """Instrument `engine` (sync or async)."""
+    target = getattr(engine, "sync_engine", engine)
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+
+def detach(engine):
+    """Undo `attach`."""
+    target = getattr(engine, "sync_engine", engine)
+    event.remove(target, "before_cursor_execute", _before_cursor_execute)
+    event.remove(target, "after_cursor_execute", _after_cursor_execute)
+    event.remove(target, "handle_error", _handle_error)
@@ -0,0 +1,92 @@
+"""
+Base repository with single-round-trip writes.
+
+`get*` methods are marked `@read_only()` and may be served by a read
+replica (see app/core/db/routing.py); subclasses should do the same.
+
+Models inherit `eager_defaults` from `Base`, so the INSERT/UPDATE emitted
+by `flush()` carries a RETURNING clause for server-generated columns (id,
+created_at, updated_at). The object is complete after the flush; no
+follow-up `session.refresh()` SELECT is needed.
+
+On databases without RETURNING SQLAlchemy falls back to a SELECT after
+the write, which is what `refresh()` did anyway.
+"""
+
+from typing import Any, AsyncIterator, Generic, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import Select, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db.base import Base
+from app.core.decorators.read_only import read_only
+
+ModelT = TypeVar("ModelT", bound=Base)
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+async def insert_returning(session, model: Type[ModelT], rows: List[dict], *returning) -> List[Any]:
+    """
+    Insert `rows` with multi-row INSERT ... RETURNING; results in row order.
+
+    `returning` defaults to the model itself (ORM objects). PostgreSQL keeps
+    the order with SQLAlchemy's sentinel support; SQLite would fall back to
+    one statement per row for that, so there the rows are sent as one
+    statement and put back in order by their (autoincrement) primary key.
+    """
+    returning = returning or (model,)
+    if session.bind.dialect.name != "sqlite":
+        statement = insert(model).returning(*returning, sort_by_parameter_order=True)
+        return list((await session.execute(statement, rows)).scalars().all())
+
+    statement = insert(model).returning(model.id, *returning)
+    result = sorted((await session.execute(statement, rows)).all(), key=lambda row: row[0])
+    return [row[1] for row in result]
+
+
+class BaseRepository(Generic[ModelT]):
+    """Common persistence operations; subclasses set `model`."""
+
+    model: Type[ModelT]
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @read_only()
+    async def get(self, id: int) -> Optional[ModelT]:
+        return await self.session.get(self.model, id)
+
+    async def create(self, obj: ModelT) -> ModelT:
+        """Insert `obj`; server defaults are loaded by the INSERT ... RETURNING."""
+        self.session.add(obj)
+        await self.session.flush()
+        return obj
+
+    async def update(self, obj: ModelT, **values: Any) -> ModelT:
+        """Apply `values` to `obj`; onupdate columns come back via UPDATE ... RETURNING."""
+        for field, value in values.items():
+            setattr(obj, field, value)
+        await self.session.flush()
+        return obj
+
+    def select_for(self, schema: Type[BaseModel]) -> Select:
+        """SELECT of the model columns that `schema` has fields for."""
+        columns = self.model.__table__.columns
+        return select(*(columns[name] for name in schema.model_fields if name in columns))
+
+    async def fetch_as(self, schema: Type[SchemaT], query: Select) -> List[SchemaT]:
+        """Run a `select_for(schema)` query and build `schema` objects without validation."""
+        result = await self.session.execute(query)
+        return [schema.model_construct(**row) for row in result.mappings()]
+
+    async def stream_as(self, schema: Type[SchemaT], query: Select, batch_size: int = 1000) -> AsyncIterator[List[SchemaT]]:
+        """
+        Like `fetch_as`, but yield `batch_size` objects at a time.
+
+        Uses a server-side cursor where the driver has one (asyncpg), so
+        memory stays flat however many rows the query returns.
+        """
+        result = await self.session.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.mappings().partitions():
+            yield [schema.model_construct(**row) for row in rows]
@@ -0,0 +1,154 @@
+"""
+Read-replica routing.
+
+Sessions from `AsyncSessionLocal` decide per statement which engine runs
+it. Everything goes to the primary unless the caller declared the work
+read-only (`read_replica()` / `@read_only()`, or `session.info["read_only"]`
+for a whole session, e.g. one feeding a streamed response), and even then the primary
+is used when:
+
+- the session has already written (read-your-writes for the request)
+- the code runs inside `primary_only()` (e.g. `@transactional`)
+- no replica is healthy
+
+A session sticks to the first replica it reads from, so one request sees
+a single, consistent snapshot. Replicas that fail to connect are skipped
+for `retry_after` seconds, then tried again.
+"""
+
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.db.pool import PoolStats
+
+_read_intent: ContextVar[bool] = ContextVar("read_intent", default=False)
+_force_primary: ContextVar[bool] = ContextVar("force_primary", default=False)
+
+
+@contextmanager
+def read_replica():
+    """Let reads in this block go to a replica."""
+    token = _read_intent.set(True)
+    try:
+        yield
+    finally:
+        _read_intent.reset(token)
+
+
+@contextmanager
+def primary_only():
+    """Keep everything in this block on the primary, even declared reads."""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+class Replica:
+    def __init__(self, engine, retry_after: float):
+        self.engine = engine
+        self.retry_after = retry_after
+        self.name = engine.url.render_as_string(hide_password=True)
+        self.healthy = True
+        self.down_since: Optional[float] = None
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.pool_stats = PoolStats(self.name)
+        self.pool_stats.attach(engine)
+
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "handle_error", self._on_error)
+        event.listen(sync_engine, "connect", self._on_connect)
+
+    def available(self) -> bool:
+        if self.healthy:
+            return True
+        # Let traffic probe it again after the cool-down
+        return time.monotonic() - self.down_since >= self.retry_after
+
+    def mark_down(self, error: str):
+        self.failures += 1
+        self.last_error = error
+        self.healthy = False
+        self.down_since = time.monotonic()
+
+    def _on_error(self, context):
+        # Only connectivity problems take a replica out; query errors are the caller's
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(f"{type(context.original_exception).__name__}: {context.original_exception}")
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.healthy = True
+        self.down_since = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "url": self.name,
+            "healthy": self.healthy,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+class ReplicaSet:
+    """Replica engines, handed out round-robin among the available ones."""
+
+    def __init__(self, engines: List[Any], retry_after: float = 30.0):
+        self.replicas = [Replica(engine, retry_after) for engine in engines]
+        self._next = itertools.cycle(range(len(self.replicas)))
+
+    def choose(self) -> Optional[Replica]:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next)]
+            if replica.available():
+                return replica
+        return None
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return [replica.snapshot() for replica in self.replicas]
+
+    def pool_snapshot(self) -> List[Dict[str, Any]]:
+        """Pool counters of each replica, labelled with its URL."""
+        return [
+            replica.pool_stats.snapshot(getattr(replica.engine, "sync_engine", replica.engine).pool)
+            for replica in self.replicas
+        ]
+
+    def dispose(self):
+        for replica in self.replicas:
+            getattr(replica.engine, "sync_engine", replica.engine).dispose()
+
+
+class RoutingSession(Session):
+    """Session that sends declared read-only statements to a replica."""
+
+    def __init__(self, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replicas is not None and self._use_replica(clause):
+            replica = self.info.get("replica")
+            if replica is None or not replica.available():
+                replica = self.replicas.choose()
+                self.info["replica"] = replica
+            if replica is not None:
+                return getattr(replica.engine, "sync_engine", replica.engine)
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+    def _use_replica(self, clause) -> bool:
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+            return False
+        if self.info.get("wrote") or _force_primary.get():
+            return False
+        return _read_intent.get() or self.info.get("read_only", False)
+
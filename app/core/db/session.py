@@ -1,9 +1,114 @@
+import uuid
+from typing import Any, Dict
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from app.core.config.settings import settings
+from app.core.db import query_stats
+from app.core.db.pool import InstrumentedQueuePool, pool_stats
+from app.core.db.routing import ReplicaSet, RoutingSession
+from app.core.db.unit_of_work import wait_after_commit
 
-engine = create_async_engine(settings.database_url, echo=False)
-AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+	"""Engine keyword arguments for `database_url`, from the DB_* settings."""
+	url = make_url(database_url)
+	options: Dict[str, Any] = {"echo": False}
+	if url.get_backend_name() == "sqlite":
+		# SQLite picks its own pool (a single shared connection for :memory:);
+		# sizing a queue pool of file handles buys nothing.
+		return options
+
+	options.update(
+		poolclass=InstrumentedQueuePool,
+		pool_size=settings.db_pool_size,
+		max_overflow=settings.db_max_overflow,
+		pool_timeout=settings.db_pool_timeout,
+		pool_recycle=settings.db_pool_recycle,
+		pool_pre_ping=settings.db_pool_pre_ping,
+	)
+	if url.get_driver_name() == "asyncpg":
+		# asyncpg's own cache, and SQLAlchemy's per-connection one on top of it
+		cache_size = settings.db_statement_cache_size
+		connect_args: Dict[str, Any] = {
+			"statement_cache_size": cache_size,
+			"prepared_statement_cache_size": cache_size,
+		}
+		if cache_size == 0:
+			# Behind PgBouncer (transaction mode) statements are still prepared,
+			# and a server connection may already hold one with asyncpg's
+			# default name: give every statement a unique name instead
+			connect_args["prepared_statement_name_func"] = _unique_statement_name
+		options["connect_args"] = connect_args
+	return options
+
+
+def _unique_statement_name() -> str:
+	return f"__asyncpg_{uuid.uuid4()}__"
+
+
+engine = create_async_engine(settings.database_url, **engine_options(settings.database_url))
+pool_stats.attach(engine)
+query_stats.attach(engine)
+
+# Optional read replicas; see app/core/db/routing.py for what goes where
+replica_urls = [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()]
+replicas = ReplicaSet(
+	[create_async_engine(url, **engine_options(url)) for url in replica_urls],
+	retry_after=settings.db_replica_retry_after,
+) if replica_urls else None
+for replica in (replicas.replicas if replicas else []):
+	query_stats.attach(replica.engine)
+
+AsyncSessionLocal = async_sessionmaker(
+	engine,
+	expire_on_commit=False,
+	sync_session_class=RoutingSession,
+	replicas=replicas,
+)
+
+
+class LazySession:
+	"""
+	Stand-in for an AsyncSession that creates the real one on first use.
+
+	Requests served entirely from cache never touch it, so they create no
+	session and do no commit/rollback bookkeeping. Any attribute access
+	(execute, add, get, ...) creates the session and is forwarded to it.
+	"""
+
+	def __init__(self, factory=None):
+		self._factory = factory or AsyncSessionLocal
+		self._session = None
+
+	@property
+	def started(self) -> bool:
+		return self._session is not None
+
+	def __getattr__(self, name):
+		if self._session is None:
+			self._session = self._factory()
+		return getattr(self._session, name)
+
+	def _has_work(self) -> bool:
+		session = self._session
+		return session is not None and bool(
+			session.in_transaction() or session.new or session.dirty or session.deleted
+		)
+
+	async def commit_if_active(self):
+		"""Commit only if something was read or written."""
+		if self._has_work():
+			await self._session.commit()
+			await wait_after_commit(self._session)
+
+	async def rollback_if_active(self):
+		if self._session is not None and self._session.in_transaction():
+			await self._session.rollback()
+
+	async def close_if_started(self):
+		if self._session is not None:
+			await self._session.close()
 
 
 async def init_db():
@@ -30,6 +135,21 @@ def close_db():
 		else:
 			# Fallback: attempt to call dispose on the engine itself
 			engine.dispose()
+		if replicas is not None:
+			replicas.dispose()
 		print("✅ Database engine disposed.")
 	except Exception as e:
 		print(f"⚠️ Error disposing DB engine: {e}")
+
+
+def pool_snapshot() -> Dict[str, Any]:
+	"""Connection pool state and counters for this worker: the primary's, and each replica's under "replicas"."""
+	data = pool_stats.snapshot(engine.sync_engine.pool)
+	if replicas is not None:
+		data["replicas"] = replicas.pool_snapshot()
+	return data
+
+
+def replicas_snapshot():
+	"""Health of each read replica, or None when none are configured."""
+	return replicas.snapshot() if replicas is not None else None
@@ -1,9 +1,51 @@
+"""
+Ambient unit of work.
+
+The outermost scope (the request's `get_db`, or the first `@transactional`
+call outside a request) owns a session and registers it as the current
+unit of work. Code running inside it finds that session through
+`current_unit_of_work()` instead of opening its own, so one request uses
+one session, one pooled connection and one commit.
+"""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Optional
+
+
+async def wait_after_commit(session):
+    """
+    Wait for the work commit hooks started for `session` (e.g. cache tag
+    bumps), so the caller's next read sees it done.
+    """
+    tasks = session.info.pop("after_commit_tasks", None)
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
 class UnitOfWork:
     def __init__(self, session):
         self.session = session
 
     async def commit(self):
         await self.session.commit()
+        await wait_after_commit(self.session)
 
     async def rollback(self):
         await self.session.rollback()
+
+
+_current: ContextVar[Optional[UnitOfWork]] = ContextVar("unit_of_work", default=None)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    return _current.get()
+
+
+def set_unit_of_work(uow: Optional[UnitOfWork]):
+    """Make `uow` the ambient unit of work; returns a token for `reset_unit_of_work`."""
+    return _current.set(uow)
+
+
+def reset_unit_of_work(token):
+    _current.reset(token)
@@ -0,0 +1,107 @@
+"""
+Micro-batching for concurrent inserts.
+
+Under bursty traffic every request doing its own INSERT + COMMIT pays a
+round trip and a commit (an fsync) per row. `WriteCoalescer.insert` instead
+queues the row; rows arriving within `max_delay` seconds (at most
+`max_batch` of them) are written with one multi-row INSERT ... RETURNING
+and one COMMIT, on a session of the coalescer's own. Each caller gets its
+own ORM object back through a future.
+
+If the batch fails (one bad row fails the whole statement), the rows are
+retried one by one in SAVEPOINTs so every caller gets its own result or
+its own error.
+
+Coalesced rows are committed independently of the caller's transaction:
+only use it for inserts that don't need to be atomic with other writes.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from app.core.db.repository import insert_returning
+from app.core.logging.logger import add_to_log
+
+
+class WriteCoalescer:
+    def __init__(self, model: Type[Any], session_factory, max_batch: int = 100, max_delay: float = 0.005):
+        self.model = model
+        self.session_factory = session_factory
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: set = set()
+
+    async def insert(self, values: Dict[str, Any]) -> Any:
+        """Insert one row with the next batch; returns the created ORM object."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((values, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._write(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        try:
+            async with self.session_factory() as session:
+                rows = await insert_returning(session, self.model, [values for values, _ in batch])
+                await session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                self._resolve(batch[0][1], error=e)
+            else:
+                await self._write_one_by_one(batch)
+            return
+
+        for (_, future), row in zip(batch, rows):
+            self._resolve(future, row)
+
+    async def _write_one_by_one(self, batch):
+        """Isolate the failing rows of a batch; the rest are still committed together."""
+        results = []
+        try:
+            async with self.session_factory() as session:
+                for values, _ in batch:
+                    try:
+                        async with session.begin_nested():
+                            row = (await insert_returning(session, self.model, [values]))[0]
+                        results.append((row, None))
+                    except Exception as e:
+                        results.append((None, e))
+                await session.commit()
+        except Exception as e:
+            add_to_log("error", f"Coalesced insert into {self.model.__tablename__} failed: {e}", show_in_terminal=False)
+            for _, future in batch:
+                self._resolve(future, error=e)
+            return
+
+        for (_, future), (row, error) in zip(batch, results):
+            self._resolve(future, row, error)
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, row: Any = None, error: Optional[BaseException] = None):
+        if future.done():  # caller gave up (cancelled)
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(row)
+
+    async def close(self):
+        """Write whatever is queued and wait for in-flight batches."""
+        self._flush_now()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
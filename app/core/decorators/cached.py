@@ -1,36 +1,299 @@
+import asyncio
+import math
+import random
+import time
 from functools import wraps
-from typing import Type, Union, List
-from pydantic import BaseModel
+from typing import Any, Dict, Generic, Optional, Type, TypeVar, Union, List
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 
-def cached(key_builder, ttl: int = 60, model: Union[Type[BaseModel], None] = None):
+from app.core.cache.cache_service import to_cacheable
+from app.core.cache.keys import tagged_key
+from app.core.db.routing import read_replica
+from app.core.logging.logger import add_to_log
+
+# Loads currently running in this process, by cache key. Concurrent misses
+# await the same task instead of each hitting the database.
+_inflight: Dict[str, asyncio.Task] = {}
+
+# How often a caller that lost the distributed lock re-checks the cache
+LOCK_POLL_INTERVAL = 0.05
+
+# Tag bumps started by a commit, referenced until they finish
+_bumps: set = set()
+
+
+def _single_flight(key: str, factory) -> asyncio.Task:
+    """Return the running load for `key`, starting one if there is none."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+
+        def _done(t, key=key):
+            if _inflight.get(key) is t:
+                del _inflight[key]
+            # Mark the exception retrieved for background refreshes nobody awaits
+            if not t.cancelled():
+                t.exception()
+
+        task.add_done_callback(_done)
+    return task
+
+
+T = TypeVar("T")
+
+
+class CacheEntry(BaseModel, Generic[T]):
+    """A cached value with its soft expiry and how long it took to load."""
+    v: T
+    exp: float
+    delta: float
+
+
+def cached(
+    key_builder,
+    ttl: int = 60,
+    model: Union[Type[BaseModel], None] = None,
+    stale_ttl: int = 0,
+    early_expiration: float = 0.0,
+    lock_timeout: Optional[float] = None,
+    tags: Optional[List[str]] = None,
+):
     """
     Decorator to cache the result of an async method.
     Expects the instance (self) to have a 'cache_service' attribute.
+
+    With `tags`, the key embeds the tags' generations; see `invalidates`.
+
+    Concurrent misses for the same key within a process share one call.
+    The shared call outlives the caller that started it, so it runs on
+    `instance.refresh_scope()` (see below) when the instance provides it;
+    an instance with a `session` but no refresh scope loads on its own,
+    since its session belongs to its request.
+
+    - lock_timeout: also coalesce misses across processes with a Redis lock.
+      Callers that lose the race poll the cache for up to this many seconds
+      before loading themselves.
+    - stale_ttl: once `ttl` has passed, keep serving the old value for this
+      many more seconds while a single refresh runs.
+    - early_expiration: XFetch beta (1.0 is a sensible value). Refreshes
+      start probabilistically before expiry, earlier for slower loads.
+
+    Refreshes run in a background task on `instance.refresh_scope()` if the
+    instance provides it (an async context manager yielding an instance with
+    its own DB session). Otherwise the caller that finds the value stale
+    refreshes it inline while everyone else keeps getting the old value.
     """
+    enveloped = stale_ttl > 0 or early_expiration > 0
+
+    # Cached bytes are validated straight into the result type; with a model
+    # this converts back to objects without building intermediate dicts.
+    value_type = Union[List[model], model] if model else Any
+    adapter = TypeAdapter(CacheEntry[value_type] if enveloped else value_type)
+
+    def needs_refresh(entry: CacheEntry) -> bool:
+        now = time.time()
+        if now >= entry.exp:
+            return True
+        if early_expiration > 0:
+            # XFetch: -log(u) is exponentially distributed, so the chance of
+            # an early refresh rises smoothly as expiry approaches.
+            gap = -entry.delta * early_expiration * math.log(1.0 - random.random())
+            return now + gap >= entry.exp
+        return False
+
     def wrapper(func):
+        async def load(cache_service, key, args, kwargs):
+            started = time.monotonic()
+            # Loaders only read, and a cached value is already a little stale
+            with read_replica():
+                result = await func(*args, **kwargs)
+
+            if enveloped:
+                entry = {
+                    "v": to_cacheable(result),
+                    "exp": time.time() + ttl,
+                    "delta": time.monotonic() - started,
+                }
+                await cache_service.set(key, entry, ttl=ttl + stale_ttl)
+            else:
+                await cache_service.set(key, result, ttl=ttl)
+            return result
+
+        async def scoped_load(instance, key, args, kwargs):
+            async with instance.refresh_scope() as fresh:
+                return await load(fresh.cache_service, key, (fresh, *args[1:]), kwargs)
+
+        async def locked_load(cache_service, key, run):
+            token = await cache_service.acquire_lock(key, lock_timeout)
+            if token is None:
+                # Another process is loading; wait for its value
+                deadline = time.monotonic() + lock_timeout
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(LOCK_POLL_INTERVAL)
+                    cached_val = await cache_service.get_as(key, adapter)
+                    if cached_val is not None:
+                        return cached_val.v if enveloped else cached_val
+                # The holder is too slow or gone; load ourselves
+                return await run()
+
+            try:
+                return await run()
+            finally:
+                await cache_service.release_lock(key, token)
+
+        async def refresh_in_background(instance, key, args, kwargs):
+            try:
+                await scoped_load(instance, key, args, kwargs)
+            except Exception as e:
+                add_to_log("error", f"Background cache refresh failed for '{key}': {e}")
+
         @wraps(func)
         async def inner(*args, **kwargs):
             # Inspect args[0] for 'self'
             instance = args[0] if args else None
             cache_service = getattr(instance, "cache_service", None)
-            
+
             if not cache_service:
                 return await func(*args, **kwargs)
 
-            key = key_builder(*args, **kwargs)
-            cached_val = await cache_service.get(key)
-            
+            key = await cache_service.tagged_key(key_builder(*args, **kwargs), tags)
+            cached_val = await cache_service.get_as(key, adapter)
+
+            scoped = hasattr(instance, "refresh_scope")
+            if scoped:
+                run = lambda: scoped_load(instance, key, args, kwargs)
+            else:
+                run = lambda: load(cache_service, key, args, kwargs)
+            # Other requests must not end up waiting on this request's session
+            shared = scoped or getattr(instance, "session", None) is None
+
             if cached_val is not None:
-                # If we have a model, verify/convert back to objects
-                if model:
-                    if isinstance(cached_val, list):
-                        return [model(**item) for item in cached_val]
-                    return model(**cached_val)
-                return cached_val
+                if not enveloped:
+                    return cached_val
+
+                if needs_refresh(cached_val) and key not in _inflight:
+                    if scoped:
+                        _single_flight(key, lambda: refresh_in_background(instance, key, args, kwargs))
+                    elif shared:
+                        task = _single_flight(key, run)
+                        return await asyncio.shield(task)
+                    else:
+                        return await run()
+                return cached_val.v
+
+            if lock_timeout:
+                factory = lambda: locked_load(cache_service, key, run)
+            else:
+                factory = run
+            if not shared:
+                return await factory()
+            task = _single_flight(key, factory)
+            # Shield so one caller's cancellation doesn't fail everyone sharing the load
+            return await asyncio.shield(task)
+        return inner
+    return wrapper
+
+
+def cached_many(
+    key_builder,
+    ttl: int = 60,
+    model: Union[Type[BaseModel], None] = None,
+    tags: Optional[List[str]] = None,
+):
+    """
+    Decorator to cache a batch loader entry by entry.
+    Expects the instance (self) to have a 'cache_service' attribute.
+
+    The decorated method is called as `method(self, ids)` and must return a
+    dict of id -> value for the ids it found. `key_builder(id)` names the
+    cache entry for one id.
+
+    Hits are fetched with one MGET, the method is called once with only the
+    missing ids, and what it returns is written back in one pipeline with a
+    TTL per key. The wrapper returns a dict in the order of `ids`; ids the
+    loader did not return are absent. `tags` works as in `cached`.
+    """
+    adapter = TypeAdapter(model if model else Any)
+
+    def wrapper(func):
+        @wraps(func)
+        async def inner(self, ids):
+            ids = list(dict.fromkeys(ids))
+            cache_service = getattr(self, "cache_service", None)
+
+            if not cache_service:
+                loaded = await func(self, ids)
+                return {i: loaded[i] for i in ids if i in loaded}
+
+            generations = await cache_service.get_generations(tags) if tags else None
+
+            def key_for(i):
+                key = key_builder(i)
+                return tagged_key(key, generations) if tags else key
+
+            hits = await cache_service.get_many_as([key_for(i) for i in ids], adapter)
+            found = {i: value for i, value in zip(ids, hits) if value is not None}
+
+            misses = [i for i in ids if i not in found]
+            if misses:
+                with read_replica():
+                    loaded = await func(self, misses)
+                if loaded:
+                    await cache_service.set_many({key_for(i): v for i, v in loaded.items()}, ttl=ttl)
+                    found.update(loaded)
+
+            return {i: found[i] for i in ids if i in found}
+        return inner
+    return wrapper
+
 
+def _bump_after_commit(session: Session):
+    for cache_service, tags in session.info.pop("invalidate_tags", {}).items():
+        task = asyncio.ensure_future(cache_service.invalidate_tags(*tags))
+        _bumps.add(task)
+        task.add_done_callback(_bumps.discard)
+        # Awaited by the unit of work that committed (see wait_after_commit)
+        session.info.setdefault("after_commit_tasks", []).append(task)
+
+
+def _drop_on_rollback(session: Session):
+    session.info.pop("invalidate_tags", None)
+
+
+event.listen(Session, "after_commit", _bump_after_commit)
+event.listen(Session, "after_rollback", _drop_on_rollback)
+
+
+def invalidates(invalidate_tags: List[str]):
+    """
+    Decorator that invalidates cache tags after an async method succeeds.
+    Expects the instance (self) to have a 'cache_service' attribute.
+
+    Bumping a tag's generation orphans every key cached with that tag,
+    without knowing or enumerating the keys.
+
+    If the instance has a 'session' in a transaction, the tags are bumped
+    once that transaction commits (and not at all if it rolls back), so a
+    concurrent miss can't cache the pre-commit rows under the new
+    generation. Otherwise they are bumped right away.
+    """
+    def wrapper(func):
+        @wraps(func)
+        async def inner(*args, **kwargs):
             result = await func(*args, **kwargs)
-            await cache_service.set(key, result, ttl=ttl)
+
+            instance = args[0] if args else None
+            cache_service = getattr(instance, "cache_service", None)
+            if cache_service:
+                session = getattr(instance, "session", None)
+                if session is not None and session.in_transaction():
+                    pending = session.info.setdefault("invalidate_tags", {})
+                    pending.setdefault(cache_service, set()).update(invalidate_tags)
+                else:
+                    await cache_service.invalidate_tags(*invalidate_tags)
             return result
         return inner
     return wrapper
-
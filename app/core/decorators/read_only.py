@@ -0,0 +1,17 @@
+from functools import wraps
+from app.core.db.routing import read_replica
+
+def read_only():
+    """
+    Mark an async method as read-only so its queries may run on a replica.
+
+    The session still uses the primary if it has already written or the
+    call happens inside `@transactional` (see app/core/db/routing.py).
+    """
+    def wrapper(func):
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            with read_replica():
+                return await func(*args, **kwargs)
+        return inner
+    return wrapper
@@ -1,18 +1,51 @@
 from functools import wraps
+from app.core.db.routing import primary_only
 from app.core.db.session import AsyncSessionLocal
+from app.core.db.unit_of_work import (
+    UnitOfWork,
+    current_unit_of_work,
+    reset_unit_of_work,
+    set_unit_of_work,
+)
 
-def transactional():
+def transactional(savepoint: bool = False):
+    """
+    Run the decorated coroutine in a transaction, passing it `session=`.
+
+    Inside an existing unit of work (a request session from `get_db`, or
+    an outer `@transactional` call) the call joins that session and the
+    owner commits once at the end. With `savepoint=True` the call runs in
+    a SAVEPOINT instead, so its failure only undoes its own changes (the
+    exception still propagates).
+
+    Outside any unit of work it opens a session, makes it the ambient one
+    for nested calls, and commits or rolls back when done.
+    """
     def wrapper(func):
         @wraps(func)
         async def inner(*args, **kwargs):
-            async with AsyncSessionLocal() as session:
-                try:
-                    kwargs["session"] = session
-                    result = await func(*args, **kwargs)
-                    await session.commit()
-                    return result
-                except Exception:
-                    await session.rollback()
-                    raise
+            # Reads in a transaction must see its writes: no replicas
+            with primary_only():
+                uow = current_unit_of_work()
+                if uow is not None:
+                    kwargs["session"] = uow.session
+                    if not savepoint:
+                        return await func(*args, **kwargs)
+                    async with uow.session.begin_nested():
+                        return await func(*args, **kwargs)
+
+                async with AsyncSessionLocal() as session:
+                    uow = UnitOfWork(session)
+                    token = set_unit_of_work(uow)
+                    try:
+                        kwargs["session"] = session
+                        result = await func(*args, **kwargs)
+                        await uow.commit()
+                        return result
+                    except Exception:
+                        await uow.rollback()
+                        raise
+                    finally:
+                        reset_unit_of_work(token)
         return inner
     return wrapper
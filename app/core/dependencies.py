@@ -8,11 +8,13 @@ This module provides reusable dependency functions for:
 - Common services
 """
 
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Depends
+from fastapi import Depends, Query
 
-from app.core.db.session import AsyncSessionLocal
+from app.core.db.session import LazySession
+from app.core.db.unit_of_work import UnitOfWork, set_unit_of_work
+from app.core.pagination import Cursor, decode_cursor
 from app.core.service_factory import ServiceFactory
 
 
@@ -20,18 +22,26 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency to get database session.
     
+    The session is created on first use and only committed if it began a
+    transaction, so requests answered from cache cost no database work.
+    It is also the request's ambient unit of work: `@transactional` calls
+    made while handling the request join it instead of opening their own.
+    
     Yields:
-        AsyncSession: Database session with automatic cleanup
+        AsyncSession: Database session (lazy proxy) with automatic cleanup
     """
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+    session = LazySession()
+    # Not reset on exit: teardown may run after the response, outside the
+    # request's context, and the request context is discarded anyway.
+    set_unit_of_work(UnitOfWork(session))
+    try:
+        yield session
+        await session.commit_if_active()
+    except Exception:
+        await session.rollback_if_active()
+        raise
+    finally:
+        await session.close_if_started()
 
 
 async def get_service_factory(session: AsyncSession = Depends(get_db)) -> ServiceFactory:
@@ -56,3 +66,21 @@ class Pagination:
     @property
     def limit(self) -> int:
         return self.size
+
+
+class CursorPagination:
+    """
+    Keyset pagination parameters for list endpoints.
+
+    Prefer this over `Pagination` for anything that can grow large: OFFSET
+    makes the database walk and discard every skipped row.
+    """
+
+    def __init__(
+        self,
+        limit: int = Query(50, ge=1, le=100, description="Maximum number of items to return"),
+        cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's links"),
+    ):
+        self.limit = limit
+        self.raw_cursor = cursor
+        self.cursor: Optional[Cursor] = decode_cursor(cursor)
@@ -1 +1,87 @@
-# Custom handlers can be defined here if needed
+"""
+Non-blocking log handlers.
+
+Loggers hand records to a BoundedQueueHandler, which only puts them on an
+in-memory queue; a RoutingQueueListener thread takes them off and does the
+file (and terminal) writes, so a slow disk never stalls the event loop.
+
+When the queue is full, the overflow policy decides:
+
+drop    the record is discarded (counted)
+block   the caller waits up to `block_timeout` for room, then drops it
+sample  once the queue is half full, only one in `sample_rate` records
+        below ERROR is kept; ERROR and above are kept, blocking like
+        "block" if the queue is full
+"""
+
+import copy
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict
+
+OVERFLOW_POLICIES = ("drop", "block", "sample")
+
+
+class BoundedQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop", block_timeout: float = 1.0, sample_rate: int = 10):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.sample_rate = max(1, sample_rate)
+        self._seen = 0
+        # Shared by every logger on the queue; bumped from any thread
+        self._lock = threading.Lock()
+        self.counters = {"enqueued": 0, "dropped": 0, "sampled_out": 0}
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message (its args may change later) and the traceback
+        # now, but leave the formatting to the listener's handlers
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.policy == "sample" and record.levelno < logging.ERROR and self._under_pressure():
+            with self._lock:
+                self._seen += 1
+                keep = self._seen % self.sample_rate == 0
+            if not keep:
+                self._count("sampled_out")
+                return
+
+        try:
+            if self.policy == "drop" or (self.policy == "sample" and record.levelno < logging.ERROR):
+                self.queue.put_nowait(record)
+            else:
+                self.queue.put(record, timeout=self.block_timeout)
+        except queue.Full:
+            self._count("dropped")
+            return
+        self._count("enqueued")
+
+    def _under_pressure(self) -> bool:
+        return self.queue.maxsize > 0 and self.queue.qsize() * 2 >= self.queue.maxsize
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+
+class RoutingQueueListener(QueueListener):
+    """Hands each record to the handlers of the logger it was logged on."""
+
+    def __init__(self, log_queue: queue.Queue, routes: Dict[str, list]):
+        super().__init__(log_queue, respect_handler_level=True)
+        self.routes = routes
+
+    def handle(self, record: logging.LogRecord):
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
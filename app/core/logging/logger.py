@@ -1,18 +1,41 @@
+import atexit
 import logging
+import queue
+import sys
+import time
 from logging.handlers import TimedRotatingFileHandler
 import json
 import os
 from app.core.config.settings import settings
+from app.core.logging.handlers import BoundedQueueHandler, RoutingQueueListener
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
 
 class JsonFormatter(logging.Formatter):
     def format(self, record):
-        return json.dumps({
+        entry = {
             "level": record.levelname,
             "message": record.getMessage(),
             "time": self.formatTime(record),
             "module": record.module,
-            "exception": record.exc_info and self.formatException(record.exc_info)
-        })
+            # Queued records carry the traceback pre-rendered in exc_text
+            "exception": self.formatException(record.exc_info) if record.exc_info else record.exc_text
+        }
+        extra = {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS}
+        if extra:
+            entry["extra"] = extra
+        return json.dumps(entry, default=str)
+
+# Records wait here for the listener thread, which does the actual writes
+log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+queue_handler = BoundedQueueHandler(
+    log_queue,
+    policy=settings.log_overflow_policy,
+    block_timeout=settings.log_queue_block_timeout,
+    sample_rate=settings.log_sample_rate,
+)
+_routes = {}
 
 def setup_logger(name, level, file):
     # Ensure log directory exists
@@ -24,10 +47,22 @@ def setup_logger(name, level, file):
         file, when="midnight", backupCount=30
     )
     handler.setFormatter(JsonFormatter())
+    _routes[name] = [handler]
 
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    logger.addHandler(handler)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+    return logger
+
+def setup_terminal_logger(name):
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _routes[name] = [handler]
+
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(queue_handler)
     logger.propagate = False
     return logger
 
@@ -37,6 +72,12 @@ log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
 debug_logger = setup_logger("debug", logging.DEBUG, f"{settings.log_dir}/debug.log")
 info_logger = setup_logger("info", logging.INFO, f"{settings.log_dir}/info.log")
 error_logger = setup_logger("error", logging.ERROR, f"{settings.log_dir}/error.log")
+# `show_in_terminal` echo, printed by the listener thread as well
+terminal_logger = setup_terminal_logger("terminal")
+
+listener = RoutingQueueListener(log_queue, _routes)
+listener.start()
+atexit.register(listener.stop)
 
 def add_to_log(level: str, message: str, show_in_terminal: bool = True, **extra):
     logger_map = {
@@ -46,5 +87,22 @@ def add_to_log(level: str, message: str, show_in_terminal: bool = True, **extra)
     }
     logger = logger_map.get(level, info_logger)
     logger.log(getattr(logging, level.upper()), message, extra=extra)
-    if show_in_terminal:
-        print(message)
+    if show_in_terminal and settings.log_terminal_echo:
+        terminal_logger.info(message)
+
+def flush_logs(timeout: float = 5.0) -> bool:
+    """Wait (up to `timeout` seconds) until the listener has written every queued record."""
+    deadline = time.monotonic() + timeout
+    while log_queue.unfinished_tasks:
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+def log_queue_stats():
+    return {
+        "queued": log_queue.qsize(),
+        "capacity": log_queue.maxsize,
+        "policy": queue_handler.policy,
+        **queue_handler.counters,
+    }
@@ -11,6 +11,12 @@ from contextvars import ContextVar
 # Context variable to store request ID across async operations
 request_id_var: ContextVar[str] = ContextVar("request_id", default="")
 
+# Bodies larger than this are not read for the log
+MAX_LOGGED_BODY = 10000
+# Bodies the route consumes as a stream (e.g. NDJSON imports); reading them
+# here would buffer the whole upload before the route starts
+STREAMED_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+
 
 def get_request_id() -> str:
     """Get the current request ID from context."""
@@ -24,10 +30,14 @@ async def logging_middleware(request: Request, call_next):
     - Request details (method, path, headers)
     - Response time
     - Status code
+    - SQL statement count and database time (see app/core/db/query_stats.py)
     """
     # Generate unique request ID
     req_id = str(uuid.uuid4())
     request_id_var.set(req_id)
+    # Imported here: the DB layer logs with request ids from this module
+    from app.core.db.query_stats import start_request_stats
+    query_stats = start_request_stats()
     
     # Add request ID to request state for access in routes
     request.state.request_id = req_id
@@ -35,12 +45,7 @@ async def logging_middleware(request: Request, call_next):
     # Start timer
     start_time = time.time()
     
-    # Try to read body (be careful with large payloads)
-    try:
-        body_bytes = await request.body()
-        payload = body_bytes.decode() if len(body_bytes) < 10000 else "<large payload>"
-    except Exception:
-        payload = "<could not read body>"
+    payload = await _loggable_body(request)
     
     # Log incoming request
     add_to_log(
@@ -70,6 +75,7 @@ async def logging_middleware(request: Request, call_next):
             method=request.method,
             status_code=response.status_code,
             duration_ms=round(duration * 1000, 2),
+            **query_stats.summary(),
             show_in_terminal=False
         )
         
@@ -87,6 +93,28 @@ async def logging_middleware(request: Request, call_next):
             path=str(request.url),
             method=request.method,
             error=str(e),
-            duration_ms=round(duration * 1000, 2)
+            duration_ms=round(duration * 1000, 2),
+            **query_stats.summary()
         )
         raise
+
+
+async def _loggable_body(request: Request) -> str:
+    """The request body for the log, or a placeholder when it isn't read."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in STREAMED_TYPES:
+        return "<streamed payload>"
+    if request.method in ("GET", "HEAD", "DELETE", "OPTIONS") and "content-length" not in request.headers:
+        return ""
+
+    # Only buffer bodies that announce a small size; chunked ones may be any size
+    try:
+        length = int(request.headers.get("content-length", ""))
+    except ValueError:
+        return "<unsized payload>"
+    if length >= MAX_LOGGED_BODY:
+        return "<large payload>"
+    try:
+        return (await request.body()).decode()
+    except Exception:
+        return "<could not read body>"
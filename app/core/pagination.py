@@ -0,0 +1,48 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Pages are addressed by the last (or first) primary key seen instead of an
+OFFSET, so fetching page N costs the same as fetching page 1: the query is
+an index range scan on the primary key starting right after the cursor.
+
+Cursors are opaque to clients (URL-safe base64 of a small JSON document)
+so the ordering key can change without breaking the API contract.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from app.core.exceptions.base import ValidationException
+
+NEXT = "next"
+PREV = "prev"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position in a keyset: fetch rows after (`next`) or before (`prev`) `id`."""
+    id: int
+    direction: str = NEXT
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    raw = json.dumps({"id": cursor.id, "d": cursor.direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(value: Optional[str]) -> Optional[Cursor]:
+    """Parse a client-supplied cursor; raises ValidationException if it is malformed."""
+    if not value:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+        data = json.loads(raw)
+        cursor = Cursor(id=int(data["id"]), direction=data.get("d", NEXT))
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValidationException("Invalid pagination cursor", errors={"cursor": value})
+    if cursor.direction not in (NEXT, PREV):
+        raise ValidationException("Invalid pagination cursor", errors={"cursor": value})
+    return cursor
@@ -0,0 +1,318 @@
+"""
+Background delivery of outbox messages.
+
+Services write notifications to the outbox table in their own transaction
+(OutboxRepository.add), so a notification exists exactly when the change
+it reports is committed. The dispatcher claims due messages in batches,
+sends them through NotificationService with bounded concurrency and
+marks them done, or schedules a retry with exponential backoff.
+
+It polls every `poll_interval` seconds, and is woken as soon as a session
+in this process commits an outbox row. Every app process may run one:
+claims use SKIP LOCKED, so they split the work instead of duplicating it.
+Delivery is at-least-once: a dispatcher that dies mid-batch leaves its
+rows to be claimed again when their lease expires.
+
+With email digests on, emails are handed to the digest without taking a
+delivery slot; their rows stay claimed and are settled when the digest
+is sent, so the digest window must be well below the lease timeout.
+"""
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config.settings import settings
+from app.core.logging.logger import add_to_log
+from .outbox_repository import OutboxRepository, utcnow
+from .services.notification_service import NotificationService
+
+# Retry delays double from `retry_backoff` up to this many seconds
+MAX_BACKOFF = 300.0
+# Deliveries kept for the lag percentiles
+LAG_SAMPLES = 1000
+# Window for the throughput figure, in seconds
+THROUGHPUT_WINDOW = 60.0
+# How often delivered messages past their retention are purged, in seconds
+PURGE_INTERVAL = 300.0
+# deliver() result for a message handed to the email digest
+DEFERRED = object()
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 1)
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything in the outbox is UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        session_factory,
+        notification_service: NotificationService,
+        batch_size: int = 100,
+        concurrency: int = 10,
+        poll_interval: float = 1.0,
+        max_attempts: int = 5,
+        retry_backoff: float = 1.0,
+        lease_timeout: float = 300.0,
+        send_timeout: float = 30.0,
+        retention: Optional[float] = 86400.0,
+    ):
+        self.session_factory = session_factory
+        self.notification_service = notification_service
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.lease_timeout = lease_timeout
+        self.send_timeout = send_timeout
+        self.retention = retention
+
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._last_purge = 0.0
+        # Digest send -> the messages it carries; settle tasks in flight
+        self._digests: Dict[asyncio.Future, List[Dict[str, Any]]] = {}
+        self._settling: set = set()
+
+        self.counters = {"batches": 0, "delivered": 0, "retried": 0, "failed": 0, "errors": 0}
+        # Milliseconds from the outbox write to delivery
+        self._lags: deque = deque(maxlen=LAG_SAMPLES)
+        # (monotonic time, messages delivered) per batch
+        self._delivered_at: deque = deque()
+
+    # -- lifecycle ------------------------------------------------------
+
+    def start(self):
+        if self._task is None:
+            event.listen(Session, "after_commit", self._after_commit)
+            event.listen(Session, "after_rollback", self._after_rollback)
+            self._task = asyncio.create_task(self._run(), name="outbox-dispatcher")
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Stop after the current batch; undelivered messages stay in the outbox.
+
+        Also waits for digests holding messages of this dispatcher. A batch
+        still running after `timeout` seconds is cancelled, and its messages
+        are claimed again once their lease expires.
+        """
+        if self._task is None:
+            return
+        event.remove(Session, "after_commit", self._after_commit)
+        event.remove(Session, "after_rollback", self._after_rollback)
+        self._stopping = True
+        self.wake()
+        deadline = time.monotonic() + timeout
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        while (self._digests or self._settling) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        self._task = None
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _after_commit(self, session: Session):
+        if session.info.pop("outbox_pending", None):
+            self.wake()
+
+    def _after_rollback(self, session: Session):
+        session.info.pop("outbox_pending", None)
+
+    # -- dispatching ----------------------------------------------------
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                claimed = await self.dispatch_batch()
+                await self._purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.counters["errors"] += 1
+                add_to_log("error", f"Outbox dispatch failed: {type(e).__name__}: {e}", show_in_terminal=False)
+                claimed = 0
+
+            # A full batch means there is probably more waiting
+            if claimed < self.batch_size and not self._stopping:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def dispatch_batch(self) -> int:
+        """Claim, deliver and settle one batch; returns how many messages were claimed."""
+        async with self.session_factory() as session:
+            messages = await OutboxRepository(session).claim(self.batch_size, self.lease_timeout)
+            await session.commit()
+        if not messages:
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(message: Dict[str, Any]) -> Any:
+            if message["kind"] == "email":
+                submit = getattr(self.notification_service, "submit_email", None)
+                digest = submit(**message["payload"]) if submit else None
+                if digest is not None:
+                    self._defer(message, digest)
+                    return DEFERRED
+            async with semaphore:
+                try:
+                    send = getattr(self.notification_service, f"send_{message['kind']}")
+                    await asyncio.wait_for(send(**message["payload"]), self.send_timeout)
+                except Exception as e:
+                    return f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+                return None
+
+        results = await asyncio.gather(*(deliver(m) for m in messages))
+        sent = [(m, error) for m, error in zip(messages, results) if error is not DEFERRED]
+        if sent:
+            await self._settle([m for m, _ in sent], [error for _, error in sent])
+        self.counters["batches"] += 1
+        return len(messages)
+
+    def _defer(self, message: Dict[str, Any], digest: asyncio.Future):
+        """Settle `message` when `digest` has been sent."""
+        if digest not in self._digests:
+            self._digests[digest] = []
+            digest.add_done_callback(self._digest_sent)
+        self._digests[digest].append(message)
+
+    def _digest_sent(self, digest: asyncio.Future):
+        messages = self._digests.pop(digest)
+        error = digest.exception()
+        if error is not None:
+            error = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+        task = asyncio.ensure_future(self._settle(messages, [error] * len(messages)))
+        self._settling.add(task)
+        task.add_done_callback(self._settled)
+
+    def _settled(self, task: asyncio.Task):
+        self._settling.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # Rows stay claimed and are retried once their lease expires
+            self.counters["errors"] += 1
+            add_to_log("error", f"Outbox settle failed: {task.exception()}", show_in_terminal=False)
+
+    async def _settle(self, messages: List[Dict[str, Any]], errors: List[Optional[str]]):
+        """Mark sent messages done and schedule (or give up on) the failed ones."""
+        now = utcnow()
+        delivered = [m for m, error in zip(messages, errors) if error is None]
+        async with self.session_factory() as session:
+            repository = OutboxRepository(session)
+            await repository.mark_done([m["id"] for m in delivered])
+            for message, error in zip(messages, errors):
+                if error is not None:
+                    await repository.mark_failed(message["id"], error, self._retry_at(message, error, now))
+            await session.commit()
+
+        self.counters["delivered"] += len(delivered)
+        self._lags.extend((now - _aware(m["created_at"])).total_seconds() * 1000 for m in delivered)
+        self._delivered_at.append((time.monotonic(), len(delivered)))
+
+    def _retry_at(self, message: Dict[str, Any], error: str, now: datetime) -> Optional[datetime]:
+        if message["attempts"] >= self.max_attempts:
+            self.counters["failed"] += 1
+            add_to_log(
+                "error",
+                f"Outbox message {message['id']} ({message['kind']}) failed after {message['attempts']} attempts: {error}",
+                outbox_id=message["id"],
+            )
+            return None
+
+        self.counters["retried"] += 1
+        delay = min(MAX_BACKOFF, self.retry_backoff * 2 ** (message["attempts"] - 1))
+        return now + timedelta(seconds=delay)
+
+    async def _purge(self):
+        if not self.retention or time.monotonic() - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        async with self.session_factory() as session:
+            await OutboxRepository(session).purge_done(utcnow() - timedelta(seconds=self.retention))
+            await session.commit()
+
+    # -- metrics ----------------------------------------------------------
+
+    def throughput(self) -> float:
+        """Messages delivered per second over the last THROUGHPUT_WINDOW seconds."""
+        horizon = time.monotonic() - THROUGHPUT_WINDOW
+        while self._delivered_at and self._delivered_at[0][0] < horizon:
+            self._delivered_at.popleft()
+        return round(sum(n for _, n in self._delivered_at) / THROUGHPUT_WINDOW, 3)
+
+    async def snapshot(self) -> Dict[str, Any]:
+        lags = list(self._lags)
+        report = {
+            "running": self._task is not None,
+            "in_digest": sum(len(messages) for messages in self._digests.values()),
+            **self.counters,
+            "throughput_per_s": self.throughput(),
+            "lag_ms": {
+                "p50": _percentile(lags, 0.5),
+                "p95": _percentile(lags, 0.95),
+                "max": round(max(lags), 1) if lags else None,
+            },
+        }
+        try:
+            async with self.session_factory() as session:
+                backlog = await OutboxRepository(session).backlog()
+        except Exception:
+            return report
+
+        oldest = backlog["oldest_created_at"]
+        report["pending"] = backlog["pending"]
+        report["oldest_pending_age_s"] = round((utcnow() - _aware(oldest)).total_seconds(), 3) if oldest else None
+        return report
+
+
+outbox_dispatcher: Optional[OutboxDispatcher] = None
+
+
+def init_outbox_dispatcher():
+    global outbox_dispatcher
+    if settings.outbox_dispatcher_enabled:
+        from app.core.db.session import AsyncSessionLocal
+        outbox_dispatcher = OutboxDispatcher(
+            AsyncSessionLocal,
+            NotificationService(),
+            batch_size=settings.outbox_batch_size,
+            concurrency=settings.outbox_concurrency,
+            poll_interval=settings.outbox_poll_interval,
+            max_attempts=settings.outbox_max_attempts,
+            retry_backoff=settings.outbox_retry_backoff,
+            lease_timeout=settings.outbox_lease_timeout,
+            send_timeout=settings.notification_send_timeout,
+            retention=settings.outbox_retention_hours * 3600,
+        )
+        outbox_dispatcher.start()
+
+
+async def close_outbox_dispatcher():
+    global outbox_dispatcher
+    if outbox_dispatcher is not None:
+        await outbox_dispatcher.stop(settings.outbox_shutdown_timeout)
+        outbox_dispatcher = None
+
+
+async def outbox_snapshot() -> Optional[Dict[str, Any]]:
+    return await outbox_dispatcher.snapshot() if outbox_dispatcher else None
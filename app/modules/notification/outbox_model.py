@@ -0,0 +1,26 @@
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text, func
+from app.core.db.base import Base
+
+# Outbox row lifecycle: pending -> processing -> done, or back to pending
+# (with a later available_at) to retry, or failed after the last attempt
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+
+class OutboxMessage(Base):
+    """A notification written in the same transaction as the change it reports."""
+
+    __tablename__ = "outbox"
+    kind = Column(String(32), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(16), nullable=False, default=PENDING, server_default=PENDING)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    # The dispatcher's claim query: oldest due rows of a status
+    __table_args__ = (Index("ix_outbox_status_available_at", "status", "available_at"),)
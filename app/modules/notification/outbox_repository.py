@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import and_, delete, func, or_, select, update
+from app.core.db.repository import BaseRepository
+from .outbox_model import DONE, FAILED, PENDING, PROCESSING, OutboxMessage
+
+_outbox = OutboxMessage.__table__
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class OutboxRepository(BaseRepository[OutboxMessage]):
+    model = OutboxMessage
+
+    async def add(self, kind: str, **payload: Any) -> OutboxMessage:
+        """
+        Record a notification in the current transaction.
+
+        It becomes visible to the dispatcher only when the transaction
+        commits, and is discarded with it on rollback.
+        """
+        now = utcnow()
+        message = OutboxMessage(kind=kind, payload=payload, created_at=now, available_at=now)
+        self.session.add(message)
+        # Lets the dispatcher in this process start right after the commit
+        self.session.info["outbox_pending"] = True
+        return message
+
+    async def claim(self, limit: int, lease: float) -> List[Dict[str, Any]]:
+        """
+        Take up to `limit` due messages, oldest first, and mark them processing.
+
+        One UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED)
+        RETURNING, so concurrent dispatchers never claim the same row and
+        never wait on each other's locks. SQLite has no row locks (and
+        renders no FOR UPDATE): it allows one writer at a time, which
+        makes the statement just as exclusive.
+
+        Messages left processing for longer than `lease` seconds (their
+        dispatcher died) are claimed again.
+        """
+        now = utcnow()
+        due = (
+            select(_outbox.c.id)
+            .where(or_(
+                and_(_outbox.c.status == PENDING, _outbox.c.available_at <= now),
+                and_(_outbox.c.status == PROCESSING, _outbox.c.claimed_at < now - timedelta(seconds=lease)),
+            ))
+            .order_by(_outbox.c.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(_outbox)
+            .where(_outbox.c.id.in_(due.scalar_subquery()))
+            .values(status=PROCESSING, claimed_at=now, attempts=_outbox.c.attempts + 1)
+            .returning(_outbox.c.id, _outbox.c.kind, _outbox.c.payload, _outbox.c.attempts, _outbox.c.created_at)
+        )
+        rows = (await self.session.execute(statement)).mappings().all()
+        return sorted((dict(row) for row in rows), key=lambda row: row["id"])
+
+    async def mark_done(self, ids: Sequence[int]):
+        if ids:
+            await self.session.execute(
+                update(_outbox)
+                .where(_outbox.c.id.in_(ids))
+                .values(status=DONE, processed_at=utcnow(), last_error=None)
+            )
+
+    async def mark_failed(self, id: int, error: str, retry_at: Optional[datetime]):
+        """Put a message back for another attempt at `retry_at`, or give up on it (None)."""
+        values = {"status": PENDING, "available_at": retry_at} if retry_at else {"status": FAILED, "processed_at": utcnow()}
+        await self.session.execute(update(_outbox).where(_outbox.c.id == id).values(last_error=error[:1000], **values))
+
+    async def purge_done(self, older_than: datetime) -> int:
+        """Delete delivered messages processed before `older_than`."""
+        result = await self.session.execute(
+            delete(_outbox).where(_outbox.c.status == DONE, _outbox.c.processed_at < older_than)
+        )
+        return result.rowcount
+
+    async def backlog(self) -> Dict[str, Any]:
+        """Messages waiting to be delivered and the creation time of the oldest."""
+        row = (await self.session.execute(
+            select(func.count(), func.min(_outbox.c.created_at))
+            .where(_outbox.c.status.in_((PENDING, PROCESSING)))
+        )).one()
+        return {"pending": row[0], "oldest_created_at": row[1]}
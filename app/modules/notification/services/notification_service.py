@@ -1,20 +1,75 @@
 from app.core.logging.logger import add_to_log
+from app.modules.notification.services.throttling import NotificationLimits
+from typing import Optional
 import asyncio
 
+# Provider rate limits, concurrency caps and email digests (see throttling.py)
+notification_limits: Optional[NotificationLimits] = None
+
+
+def init_notification_limits():
+    global notification_limits
+    notification_limits = NotificationLimits(_send_email)
+
+
+def notification_stats() -> Optional[dict]:
+    return notification_limits.snapshot() if notification_limits else None
+
+
 class NotificationService:
+    """
+    Sends notifications now, within the provider limits.
+
+    Notifications about a database change should be written to the outbox
+    (OutboxRepository.add) instead: they are then sent by the outbox
+    dispatcher once the change commits, off the request path.
+    """
+
     def __init__(self):
         # Notification service might not need session, but if it logged to DB it would.
         # For now, it's stateless/external.
         pass
 
     async def send_email(self, recipient: str, subject: str, body: str):
-        """Dummy method to send email."""
-        add_to_log("info", f"Sending email to {recipient}: {subject}")
-        # Simulate delay
-        await asyncio.sleep(0.1)
-        add_to_log("info", "Email sent successfully")
+        """Send an email, within the email rate/concurrency limits (and digest, if enabled)."""
+        limits = notification_limits
+        if limits is None:
+            await _send_email(recipient, subject, body)
+        elif limits.email_digest is not None:
+            await limits.email_digest.add(recipient, subject, body)
+        else:
+            await limits.channels["email"].send(lambda: _send_email(recipient, subject, body))
+
+    def submit_email(self, recipient: str, subject: str, body: str) -> Optional[asyncio.Future]:
+        """
+        Hand an email to its digest without waiting for the digest window.
+
+        Returns a future that resolves when the digest has been sent, or
+        None when digest mode is off (use `send_email`).
+        """
+        limits = notification_limits
+        if limits is None or limits.email_digest is None:
+            return None
+        return limits.email_digest.submit(recipient, subject, body)
 
     async def send_sms(self, phone: str, message: str):
-        """Dummy method to send SMS."""
-        add_to_log("info", f"Sending SMS to {phone}: {message}")
-        await asyncio.sleep(0.1)
+        """Send an SMS, within the SMS rate/concurrency limits."""
+        limits = notification_limits
+        if limits is None:
+            await _send_sms(phone, message)
+        else:
+            await limits.channels["sms"].send(lambda: _send_sms(phone, message))
+
+
+async def _send_email(recipient: str, subject: str, body: str):
+    """Dummy method to send email."""
+    add_to_log("info", f"Sending email to {recipient}: {subject}")
+    # Simulate delay
+    await asyncio.sleep(0.1)
+    add_to_log("info", "Email sent successfully")
+
+
+async def _send_sms(phone: str, message: str):
+    """Dummy method to send SMS."""
+    add_to_log("info", f"Sending SMS to {phone}: {message}")
+    await asyncio.sleep(0.1)
@@ -0,0 +1,199 @@
+"""
+Limits on outgoing notifications, per channel (email, sms) and per process.
+
+- TokenBucket: at most `rate` sends per second, with bursts of up to
+  `burst`; senders over the limit wait for a token (counted as throttled)
+- a semaphore caps the sends in flight at the provider
+- EmailDigest (optional): emails with the same recipient and subject that
+  arrive within `window` seconds are merged into one
+
+NotificationService.send_* applies them, so they hold for the outbox
+dispatcher and for direct sends alike.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config.settings import settings
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`; rate 0 means unlimited."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        # Waiters take tokens in arrival order
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> bool:
+        """Take a token, waiting for one if needed; True if the caller had to wait."""
+        if self.rate <= 0:
+            return False
+        async with self._lock:
+            self._refill()
+            waited = False
+            while self.tokens < 1:
+                waited = True
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+            return waited
+
+
+class ChannelLimiter:
+    """Rate limit, concurrency cap and counters for one channel."""
+
+    def __init__(self, name: str, rate: float, burst: int, concurrency: int):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = max(1, concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.in_flight = 0
+        self.counters = {"sent": 0, "failed": 0, "throttled": 0, "merged": 0}
+
+    async def send(self, operation: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one provider call once a token and a concurrency slot are free."""
+        if await self.bucket.acquire():
+            self.counters["throttled"] += 1
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                result = await operation()
+            except Exception:
+                self.counters["failed"] += 1
+                raise
+            finally:
+                self.in_flight -= 1
+        self.counters["sent"] += 1
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rate_per_s": self.bucket.rate or None,
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            **self.counters,
+        }
+
+
+class EmailDigest:
+    """
+    Merges emails to the same recipient with the same subject.
+
+    `send` is the provider call; merged emails go through `limiter` like
+    any other.
+
+    The first email for a (recipient, subject) opens a `window`-second
+    digest; the ones that arrive before it closes (up to `max_items`) are
+    sent with it as a single email.
+
+    `submit` hands an email over and returns at once with a future for the
+    digest's send, so callers don't hold a delivery slot for the window
+    (the outbox dispatcher settles its rows when the future resolves).
+    `add` waits for that send. Either way every caller gets the outcome of
+    the send, and retrying a failed digest is up to each of them.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        max_items: int,
+        send: Callable[[str, str, str], Awaitable[Any]],
+        limiter: ChannelLimiter,
+        timeout: Optional[float] = None,
+    ):
+        self.window = window
+        self.max_items = max(1, max_items)
+        self._send = send
+        self.limiter = limiter
+        self.timeout = timeout
+        self._open: Dict[Tuple[str, str], Tuple[List[str], asyncio.Future, asyncio.TimerHandle]] = {}
+        self._flushes: set = set()
+
+    async def add(self, recipient: str, subject: str, body: str):
+        # Shielded: a caller giving up must not cancel the send for the others
+        await asyncio.shield(self.submit(recipient, subject, body))
+
+    def submit(self, recipient: str, subject: str, body: str) -> asyncio.Future:
+        """Add an email to its digest; the future resolves when the digest has been sent."""
+        key = (recipient, subject)
+        entry = self._open.get(key)
+        if entry is None:
+            loop = asyncio.get_running_loop()
+            entry = ([], loop.create_future(), loop.call_later(self.window, self._close, key))
+            self._open[key] = entry
+
+        bodies, future, _ = entry
+        bodies.append(body)
+        if len(bodies) >= self.max_items:
+            self._close(key)
+        return future
+
+    def _close(self, key: Tuple[str, str]):
+        entry = self._open.pop(key, None)
+        if entry is None:
+            return
+        bodies, future, timer = entry
+        timer.cancel()
+        task = asyncio.ensure_future(self._deliver(key, bodies, future))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _deliver(self, key: Tuple[str, str], bodies: List[str], future: asyncio.Future):
+        recipient, subject = key
+        if len(bodies) > 1:
+            self.limiter.counters["merged"] += len(bodies) - 1
+            subject = f"{subject} ({len(bodies)} notifications)"
+        body = "\n\n".join(bodies)
+        try:
+            await asyncio.wait_for(self.limiter.send(lambda: self._send(recipient, subject, body)), self.timeout)
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here too: every waiter may have given up already
+            future.exception()
+        else:
+            future.set_result(None)
+
+
+class NotificationLimits:
+    """Per-process limits for every channel, built from settings; `send_email` is the provider call."""
+
+    def __init__(self, send_email: Callable[[str, str, str], Awaitable[Any]]):
+        self.channels = {
+            "email": ChannelLimiter(
+                "email",
+                settings.notification_email_rate,
+                settings.notification_email_burst,
+                settings.notification_email_concurrency,
+            ),
+            "sms": ChannelLimiter(
+                "sms",
+                settings.notification_sms_rate,
+                settings.notification_sms_burst,
+                settings.notification_sms_concurrency,
+            ),
+        }
+        self.email_digest: Optional[EmailDigest] = None
+        if settings.notification_digest_window > 0:
+            self.email_digest = EmailDigest(
+                settings.notification_digest_window,
+                settings.notification_digest_max_items,
+                send_email,
+                self.channels["email"],
+                timeout=settings.notification_send_timeout,
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "digest_window_s": self.email_digest.window if self.email_digest else None,
+            **{name: channel.snapshot() for name, channel in self.channels.items()},
+        }
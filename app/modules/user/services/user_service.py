@@ -1,3 +1,8 @@
+from contextlib import asynccontextmanager
+import csv
+import io
+from typing import Any, AsyncIterable, AsyncIterator, Dict, List, Optional
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..user_repository import UserRepository
 from ..user_model import User
@@ -5,35 +10,185 @@ from ..user_schema import UserCreate
 # Note: We don't import NotificationService type here to avoid circular imports if it ever happens? 
 # Actually we can import checking TYPE_CHECKING or just import if distinct.
 from app.modules.notification.services.notification_service import NotificationService
+from app.modules.notification.outbox_repository import OutboxRepository
 
-from app.core.cache.keys import CacheKeys
+from app.core.cache.keys import CacheKeys, CacheTags
 from app.core.cache.cache_service import CacheService
-from app.core.decorators.cached import cached
-from ..user_schema import UserRead
+from app.core.decorators.cached import cached, cached_many, invalidates
+from app.core.db.session import AsyncSessionLocal
+from ..user_schema import BulkCreateResult, BulkRowError, UserPage, UserRead
+from app.core.pagination import NEXT, PREV, Cursor, encode_cursor
+from app.core.exceptions.base import ValidationException
+
+# Rows validated and inserted per statement batch in bulk imports
+BULK_CHUNK_SIZE = 1000
+# Rejected rows reported back in detail; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+# Rows fetched from the server-side cursor (and written out) per chunk
+EXPORT_BATCH_SIZE = 1000
+
+_user_create = TypeAdapter(UserCreate)
+
 
 class UserService:
     def __init__(self, session: AsyncSession, notification_service: NotificationService, cache_service: CacheService):
+        self.session = session
         self.repository = UserRepository(session)
+        self.outbox = OutboxRepository(session)
         self.notification_service = notification_service
         self.cache_service = cache_service
 
+    @asynccontextmanager
+    async def refresh_scope(self):
+        """Yield a copy of this service on its own session (used by background cache refreshes)."""
+        async with AsyncSessionLocal() as session:
+            yield UserService(session, self.notification_service, self.cache_service)
+
+    @invalidates(invalidate_tags=[CacheTags.USERS])
     async def create_user(self, payload: UserCreate) -> User:
         user = User(**payload.model_dump())
         created_user = await self.repository.create(user)
         
-        # Send notification
-        await self.notification_service.send_email(
+        # Committed with the user and delivered by the outbox dispatcher.
+        # (With DB_WRITE_COALESCING the user row is committed by the coalescer
+        # first, so the two are no longer atomic.)
+        await self.outbox.add(
+            "email",
             recipient="admin@example.com",
             subject="New User Created",
             body=f"User '{created_user.name}' was created with ID {created_user.id}"
         )
         
-        # Invalidate cache
-        await self.cache_service.delete(CacheKeys.USER_LIST)
-        
         return created_user
 
-    @cached(key_builder=lambda *args, **kwargs: CacheKeys.USER_LIST, model=UserRead)
-    async def get_users(self):
-        users = await self.repository.get_all()
-        return [UserRead.model_validate(u) for u in users]
+    @invalidates(invalidate_tags=[CacheTags.USERS])
+    async def bulk_create_users(self, rows: AsyncIterable[Any], return_ids: bool = True) -> BulkCreateResult:
+        """
+        Import users from `rows`: raw JSON documents as bytes (NDJSON lines),
+        or already decoded values (JSON array elements). Decoded values are
+        never parsed again, so a string element is a validation error.
+
+        Rows are validated and inserted BULK_CHUNK_SIZE at a time; invalid
+        rows are skipped and reported by position, valid ones are inserted.
+        The cache is invalidated and the admin notified once for the whole
+        import, not once per user.
+
+        With `return_ids=False` PostgreSQL imports use COPY instead of
+        INSERT ... RETURNING.
+        """
+        result = BulkCreateResult(created=0, failed=0, ids=[] if return_ids else None)
+        chunk: List[Dict[str, Any]] = []
+
+        async def flush():
+            if not chunk:
+                return
+            if return_ids or not await self.repository.copy_create(chunk):
+                ids = await self.repository.bulk_create(chunk)
+                if return_ids:
+                    result.ids.extend(ids)
+            result.created += len(chunk)
+            chunk.clear()
+
+        index = 0
+        async for row in rows:
+            try:
+                if isinstance(row, bytes):
+                    user = _user_create.validate_json(row)
+                else:
+                    user = _user_create.validate_python(row)
+            except ValidationError as e:
+                result.failed += 1
+                if len(result.errors) < MAX_REPORTED_ERRORS:
+                    result.errors.append(BulkRowError(
+                        index=index,
+                        errors=e.errors(include_url=False, include_context=False, include_input=False),
+                    ))
+            else:
+                chunk.append(user.model_dump())
+                if len(chunk) >= BULK_CHUNK_SIZE:
+                    await flush()
+            index += 1
+        await flush()
+
+        if result.created:
+            await self.outbox.add(
+                "email",
+                recipient="admin@example.com",
+                subject="Users Imported",
+                body=f"{result.created} users were imported ({result.failed} rows rejected)"
+            )
+        return result
+
+    async def export_users(self, format: str = "ndjson") -> AsyncIterator[bytes]:
+        """
+        Every user encoded as NDJSON or CSV, one chunk per EXPORT_BATCH_SIZE rows.
+
+        Rows are streamed from the database and encoded batch by batch, so
+        memory use doesn't depend on the number of users.
+        """
+        # Whole session is read-only: let it run on a replica if there is one
+        self.repository.session.info["read_only"] = True
+        fields = ["id", *(f for f in UserRead.model_fields if f != "id")]
+
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(fields)
+            # Header goes out before the first query returns
+            yield buffer.getvalue().encode()
+
+        async for users in self.repository.stream_all(UserRead, EXPORT_BATCH_SIZE):
+            if format == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([getattr(u, f) for f in fields] for u in users)
+                yield buffer.getvalue().encode()
+            else:
+                yield b"".join(u.__pydantic_serializer__.to_json(u) + b"\n" for u in users)
+
+    @cached(
+        key_builder=lambda self, limit=50, cursor=None: CacheKeys.user_page(
+            limit, encode_cursor(cursor) if cursor else None
+        ),
+        model=UserPage,
+        stale_ttl=30,
+        lock_timeout=5,
+        tags=[CacheTags.USERS],
+    )
+    async def get_users(self, limit: int = 50, cursor: Optional[Cursor] = None) -> UserPage:
+        backwards = cursor is not None and cursor.direction == PREV
+        # Column projection straight into UserRead: no ORM objects, no re-validation
+        items = await self.repository.get_page(
+            limit,
+            after_id=cursor.id if cursor and not backwards else None,
+            before_id=cursor.id if backwards else None,
+            schema=UserRead,
+        )
+        has_more = len(items) > limit
+        items = items[:limit]
+        if backwards:
+            items.reverse()
+
+        if not items:
+            return UserPage(items=[])
+
+        # Going forwards there is a previous page whenever we started from a
+        # cursor; going backwards there is always a next one.
+        more_after = has_more if not backwards else True
+        more_before = has_more if backwards else cursor is not None
+        return UserPage(
+            items=items,
+            next_cursor=encode_cursor(Cursor(items[-1].id, NEXT)) if more_after else None,
+            prev_cursor=encode_cursor(Cursor(items[0].id, PREV)) if more_before else None,
+        )
+
+    async def search_users(self, q: str, limit: int = 20) -> List[UserRead]:
+        # A blank term would match every name
+        if not q.strip():
+            raise ValidationException("Search term must not be blank", {"q": "blank"})
+        return await self.repository.search_by_name(q, limit, schema=UserRead)
+
+    @cached_many(key_builder=CacheKeys.user_detail, model=UserRead)
+    async def get_users_by_ids(self, ids: List[int]) -> Dict[int, UserRead]:
+        users = await self.repository.get_by_ids(ids)
+        return {u.id: UserRead.model_validate(u) for u in users}
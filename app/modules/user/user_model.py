@@ -1,7 +1,11 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String, func
 from app.core.db.base import Base
 
 class User(Base):
     __tablename__ = "users"
     description = Column(String, nullable=True)
     name = Column(String, nullable=False)
+
+    # Name search; PostgreSQL also gets a trigram GIN index (see the
+    # "add user name search indexes" migration)
+    __table_args__ = (Index("ix_users_name_lower", func.lower(name)),)
@@ -1,17 +1,167 @@
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, AsyncIterator, Dict, List, Optional, Type
+from sqlalchemy import case, func
 from sqlalchemy.future import select
+from app.core.config.settings import settings
+from app.core.db.repository import BaseRepository, SchemaT, insert_returning
+from app.core.db.write_coalescer import WriteCoalescer
+from app.core.decorators.read_only import read_only
 from .user_model import User
 
-class UserRepository:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+# Optional micro-batching of single-user inserts (DB_WRITE_COALESCING)
+user_coalescer: Optional[WriteCoalescer] = None
+
+
+def init_user_write_coalescer():
+    global user_coalescer
+    if settings.db_write_coalescing:
+        from app.core.db.session import AsyncSessionLocal
+        user_coalescer = WriteCoalescer(
+            User,
+            AsyncSessionLocal,
+            max_batch=settings.db_coalesce_max_batch,
+            max_delay=settings.db_coalesce_max_delay_ms / 1000,
+        )
+
+
+async def close_user_write_coalescer():
+    global user_coalescer
+    if user_coalescer is not None:
+        await user_coalescer.close()
+        user_coalescer = None
+
+
+class UserRepository(BaseRepository[User]):
+    model = User
 
     async def create(self, user: User) -> User:
-        self.session.add(user)
-        await self.session.flush()  # Generate ID
-        await self.session.refresh(user)  # Refresh object with new ID
-        return user
+        """
+        Insert a user.
+
+        With write coalescing on, the insert is batched with concurrent ones
+        and committed on its own (not as part of this session's transaction);
+        the returned object is detached from this session.
+        """
+        if user_coalescer is None:
+            return await super().create(user)
+        values = {c.key: getattr(user, c.key) for c in User.__table__.columns if getattr(user, c.key) is not None}
+        return await user_coalescer.insert(values)
+
+    async def bulk_create(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert many users and return their IDs in the order given.
+
+        Multi-row INSERT ... VALUES (...), (...) RETURNING id statements
+        (see insert_returning), so there is no per-row flush/refresh round trip.
+        """
+        if not rows:
+            return []
+        return await insert_returning(self.session, User, rows, User.id)
+
+    async def copy_create(self, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Insert many users with COPY on PostgreSQL/asyncpg.
+
+        Faster than INSERT for large imports but returns no IDs. Returns
+        False without inserting anything on other databases/drivers, so the
+        caller can fall back to `bulk_create`.
+        """
+        connection = await self.session.connection()
+        if connection.dialect.name != "postgresql" or connection.dialect.driver != "asyncpg":
+            return False
+        if not rows:
+            return True
+
+        columns = ["name", "description"]
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            User.__tablename__,
+            records=[tuple(row.get(c) for c in columns) for row in rows],
+            columns=columns,
+        )
+        return True
+
+    def stream_all(self, schema: Type[SchemaT], batch_size: int = 1000) -> AsyncIterator[List[SchemaT]]:
+        """Every user as `schema` objects, oldest first, in batches (see BaseRepository.stream_as)."""
+        return self.stream_as(schema, self.select_for(schema).order_by(User.id), batch_size)
 
+    @read_only()
     async def get_all(self):
         result = await self.session.execute(select(User))
         return result.scalars().all()
+
+    @read_only()
+    async def get_page(
+        self,
+        limit: int,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+        schema: Optional[Type[SchemaT]] = None,
+    ):
+        """
+        Fetch up to `limit` + 1 users by keyset on the primary key.
+
+        The extra row only tells the caller whether there is another page.
+        With `before_id` rows come back in descending id order (nearest first).
+        With `schema`, only its columns are read and `schema` objects are
+        returned instead of ORM instances (see BaseRepository.fetch_as).
+        """
+        query = self.select_for(schema) if schema else select(User)
+        if before_id is not None:
+            query = query.where(User.id < before_id).order_by(User.id.desc())
+        else:
+            if after_id is not None:
+                query = query.where(User.id > after_id)
+            query = query.order_by(User.id)
+        query = query.limit(limit + 1)
+
+        if schema:
+            return await self.fetch_as(schema, query)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    @read_only()
+    async def search_by_name(self, q: str, limit: int = 20, schema: Optional[Type[SchemaT]] = None):
+        """
+        Users whose name matches `q` (case-insensitive), best matches first.
+
+        PostgreSQL: names starting with or containing `q`, or similar to it
+        (pg_trgm), ranked prefix matches first, then by trigram similarity;
+        served by the trigram GIN index.
+
+        Other databases: names starting with `q`, exact matches first, then
+        shortest; a range scan on the lower(name) index.
+        """
+        term = q.strip().lower()
+        if not term:
+            return []
+        name = func.lower(User.name)
+        query = self.select_for(schema) if schema else select(User)
+
+        if self.session.bind.dialect.name == "postgresql":
+            pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            query = query.where(
+                name.like(f"%{pattern}%") | name.op("%")(term)
+            ).order_by(
+                name.like(f"{pattern}%").desc(),
+                func.similarity(name, term).desc(),
+                User.id,
+            )
+        else:
+            # Range instead of LIKE 'q%' so the expression index is usable
+            query = query.where(name >= term, name < term + "\U0010ffff").order_by(
+                case((name == term, 0), else_=1),
+                func.length(User.name),
+                User.id,
+            )
+
+        query = query.limit(limit)
+        if schema:
+            return await self.fetch_as(schema, query)
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
+    @read_only()
+    async def get_by_ids(self, ids: List[int]):
+        """Fetch several users in a single query."""
+        result = await self.session.execute(select(User).where(User.id.in_(ids)))
+        return result.scalars().all()
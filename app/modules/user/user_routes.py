@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Any, AsyncIterator, List
 
 from app.core.service_factory import ServiceFactory
-from app.core.dependencies import get_service_factory
-from .user_schema import UserCreate, UserRead
+from app.core.dependencies import CursorPagination, get_service_factory
+from app.core.exceptions.base import ValidationException
+from .user_schema import BulkCreateResult, UserCreate, UserRead
 
 router = APIRouter()
 
@@ -23,11 +25,115 @@ async def create_user(
     return await factory.user.create_user(payload)
 
 
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+
+
+async def _ndjson_rows(request: Request) -> AsyncIterator[bytes]:
+    """Yield the non-blank lines of a streamed NDJSON body as they arrive."""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+async def _json_rows(request: Request) -> AsyncIterator[Any]:
+    try:
+        rows = await request.json()
+    except ValueError as e:  # json.JSONDecodeError / UnicodeDecodeError
+        raise ValidationException(f"Malformed JSON body: {e}")
+    if not isinstance(rows, list):
+        raise ValidationException("Expected a JSON array of users")
+    for row in rows:
+        yield row
+
+
+@router.post("/bulk", response_model=BulkCreateResult, status_code=201)
+async def bulk_create_users(
+    request: Request,
+    return_ids: bool = Query(True, description="Return the new IDs (PostgreSQL uses COPY when false)"),
+    factory: ServiceFactory = Depends(get_service_factory)
+):
+    """
+    Create many users in one request.
+    
+    The body is either a JSON array of users or, with
+    `Content-Type: application/x-ndjson`, one user per line. NDJSON bodies
+    are processed as they stream in, so imports of any size run in
+    constant memory.
+    
+    Invalid rows don't fail the request: they are skipped and listed in
+    `errors` by their position.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    rows = _ndjson_rows(request) if content_type in NDJSON_TYPES else _json_rows(request)
+    return await factory.user.bulk_create_users(rows, return_ids=return_ids)
+
+
+@router.get("/export")
+async def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    factory: ServiceFactory = Depends(get_service_factory)
+):
+    """
+    Export every user as NDJSON (one JSON object per line) or CSV.
+    
+    The body is streamed as rows are read from the database, so exports of
+    any size start immediately and use constant memory on the server.
+    """
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        factory.user.export_users(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
+
+
+@router.get("/search", response_model=List[UserRead])
+async def search_users(
+    q: str = Query(..., min_length=1, max_length=255, description="Name or part of a name"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    factory: ServiceFactory = Depends(get_service_factory)
+):
+    """
+    Search users by name (case-insensitive), best matches first.
+    
+    On PostgreSQL names containing or similar to `q` match too (trigram
+    index); on SQLite names must start with `q`.
+    """
+    return await factory.user.search_users(q, limit)
+
+
 @router.get("/", response_model=List[UserRead])
-async def list_users(factory: ServiceFactory = Depends(get_service_factory)):
+async def list_users(
+    request: Request,
+    response: Response,
+    pagination: CursorPagination = Depends(),
+    factory: ServiceFactory = Depends(get_service_factory)
+):
     """
-    List all users.
+    List users, oldest first, one page at a time.
+    
+    - **limit**: Page size (1-100, default 50)
+    - **cursor**: Cursor taken from the `Link` header of a previous page
     
-    Returns a list of all users in the database.
+    The body is the list of users on the page. Neighbouring pages are
+    linked from the `Link` header (`rel="next"` / `rel="prev"`); the raw
+    cursors are also returned in `X-Next-Cursor` / `X-Prev-Cursor`.
     """
-    return await factory.user.get_users()
+    page = await factory.user.get_users(limit=pagination.limit, cursor=pagination.cursor)
+
+    links = []
+    for rel, cursor in (("next", page.next_cursor), ("prev", page.prev_cursor)):
+        if cursor:
+            url = request.url.include_query_params(limit=pagination.limit, cursor=cursor)
+            links.append(f'<{url}>; rel="{rel}"')
+            response.headers[f"X-{rel.capitalize()}-Cursor"] = cursor
+    if links:
+        response.headers["Link"] = ", ".join(links)
+
+    return page.items
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 
 class UserBase(BaseModel):
@@ -43,4 +43,28 @@ class UserRead(UserBase):
     description: Optional[str] = Field(..., description="Description of the user")
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class UserPage(BaseModel):
+    """One page of users with the cursors of its neighbours."""
+
+    items: List[UserRead]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class BulkRowError(BaseModel):
+    """Why one row of a bulk request was rejected."""
+
+    index: int = Field(..., description="Zero-based position of the row in the request")
+    errors: List[Dict[str, Any]]
+
+
+class BulkCreateResult(BaseModel):
+    """Outcome of a bulk user import."""
+
+    created: int
+    failed: int
+    ids: Optional[List[int]] = Field(None, description="IDs of the created users, in request order (omitted with return_ids=false)")
+    errors: List[BulkRowError] = Field(default_factory=list, description="Rejected rows (the first 1000)")
@@ -0,0 +1,100 @@
+"""
+Benchmark round trips on the single-row write path.
+
+Compares, per created/updated user:
+
+- refresh:   add + flush + session.refresh() (the old UserRepository.create)
+- returning: BaseRepository.create / update (server-generated columns come
+             back with INSERT/UPDATE ... RETURNING)
+
+Statements are counted at the cursor level, so the numbers are what the
+database actually receives. Runs on in-memory SQLite unless --url is
+given; point it at a scratch PostgreSQL database to see network round
+trips (tables are created if missing, and every write is rolled back).
+
+Usage:
+    python -m benchmarks.repository_writes [--rows 1000] [--url postgresql+asyncpg://...]
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.db.base import Base
+from app.modules.user.user_model import User
+from app.modules.user.user_repository import UserRepository
+
+
+async def run(url: str, rows: int):
+    engine = create_async_engine(url)
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def refresh_create(session, i):
+        user = User(name=f"User {i}")
+        session.add(user)
+        await session.flush()
+        await session.refresh(user)
+        return user
+
+    async def refresh_update(session, user):
+        user.description = "updated"
+        await session.flush()
+        await session.refresh(user)
+
+    async def returning_create(session, i):
+        return await UserRepository(session).create(User(name=f"User {i}"))
+
+    async def returning_update(session, user):
+        await UserRepository(session).update(user, description="updated")
+
+    header = f"{'path':>10} {'op':>7} {'statements/row':>15} {'ms/row':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for name, create, update in (
+        ("refresh", refresh_create, refresh_update),
+        ("returning", returning_create, returning_update),
+    ):
+        async with Session() as session:
+            users = []
+            statements = 0
+            started = time.perf_counter()
+            for i in range(rows):
+                users.append(await create(session, i))
+            elapsed = time.perf_counter() - started
+            print(f"{name:>10} {'create':>7} {statements / rows:>15.2f} {elapsed * 1000 / rows:>8.3f}")
+
+            statements = 0
+            started = time.perf_counter()
+            for user in users:
+                await update(session, user)
+            elapsed = time.perf_counter() - started
+            print(f"{name:>10} {'update':>7} {statements / rows:>15.2f} {elapsed * 1000 / rows:>8.3f}")
+            await session.rollback()
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--url", default="sqlite+aiosqlite:///:memory:")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.rows))
+
+
+if __name__ == "__main__":
+    main()
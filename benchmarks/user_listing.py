@@ -0,0 +1,95 @@
+"""
+Benchmark building UserRead lists from the database.
+
+Compares, for the same rows:
+
+- orm:        select(User) -> ORM instances -> UserRead.model_validate per row
+              (the old UserService.get_users path)
+- projection: BaseRepository.select_for(UserRead) + fetch_as -> column rows
+              -> UserRead.model_construct (the current path)
+- json:       projection, then the whole list serialized to JSON bytes in
+              one TypeAdapter call (what a response would cost on top)
+
+Runs on in-memory SQLite unless --url points at a scratch database.
+
+Usage:
+    python -m benchmarks.user_listing [--sizes 10000 100000] [--url postgresql+asyncpg://...]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.db.base import Base
+from app.modules.user.user_model import User
+from app.modules.user.user_repository import UserRepository
+from app.modules.user.user_schema import UserRead
+
+
+async def best_of(fn, repeat: int) -> float:
+    """Best wall time of `repeat` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+async def run(url: str, sizes: List[int]):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    adapter = TypeAdapter(List[UserRead])
+
+    header = f"{'rows':>7} {'orm ms':>9} {'projection ms':>14} {'json ms':>9} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for n in sizes:
+        async with Session() as session:
+            await session.execute(
+                insert(User),
+                [{"name": f"User {i}", "description": f"Description for user number {i}"} for i in range(n)],
+            )
+            repository = UserRepository(session)
+
+            async def orm():
+                session.expunge_all()
+                result = await session.execute(select(User).order_by(User.id))
+                return [UserRead.model_validate(u) for u in result.scalars().all()]
+
+            async def projection():
+                return await repository.fetch_as(UserRead, repository.select_for(UserRead).order_by(User.id))
+
+            async def json():
+                return adapter.dump_json(await projection())
+
+            assert len(await projection()) == n
+            repeat = 3 if n <= 10_000 else 1
+            orm_ms = await best_of(orm, repeat)
+            projection_ms = await best_of(projection, repeat)
+            json_ms = await best_of(json, repeat)
+            print(f"{n:>7} {orm_ms:>9.1f} {projection_ms:>14.1f} {json_ms:>9.1f} {orm_ms / projection_ms:>7.1f}x")
+
+            await session.rollback()
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--url", default="sqlite+aiosqlite:///:memory:")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.sizes))
+
+
+if __name__ == "__main__":
+    main()
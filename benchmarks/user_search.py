@@ -0,0 +1,110 @@
+"""
+Benchmark user name search latency across table sizes.
+
+For each size, times UserRepository.search_by_name with the search
+indexes in place and again after dropping them (sequential scan), using
+random three-letter prefixes of existing names.
+
+Runs on in-memory SQLite unless --url points at a scratch database; on
+PostgreSQL create the pg_trgm extension there first.
+
+Usage:
+    python -m benchmarks.user_search [--sizes 1000 10000 100000] [--queries 200]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import string
+import time
+from typing import List
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.db.base import Base
+from app.modules.user.user_model import User
+from app.modules.user.user_repository import UserRepository
+from app.modules.user.user_schema import UserRead
+
+INDEXES = ("ix_users_name_lower", "ix_users_name_trgm")
+
+
+def random_name(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12))).capitalize()
+
+
+async def create_indexes(session, dialect: str):
+    await session.execute(text("CREATE INDEX IF NOT EXISTS ix_users_name_lower ON users (lower(name))"))
+    if dialect == "postgresql":
+        await session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_users_name_trgm ON users USING gin (lower(name) gin_trgm_ops)"
+        ))
+
+
+async def drop_indexes(session):
+    for index in INDEXES:
+        await session.execute(text(f"DROP INDEX IF EXISTS {index}"))
+
+
+async def timings(repository: UserRepository, terms: List[str]) -> List[float]:
+    result = []
+    for term in terms:
+        started = time.perf_counter()
+        await repository.search_by_name(term, limit=20, schema=UserRead)
+        result.append((time.perf_counter() - started) * 1000)
+    return result
+
+
+async def run(url: str, sizes: List[int], queries: int):
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    rng = random.Random(42)
+
+    header = f"{'rows':>7} {'indexed p50':>12} {'indexed p95':>12} {'scan p50':>9} {'scan p95':>9}"
+    print(header + "   (ms)")
+    print("-" * len(header))
+
+    for n in sizes:
+        async with Session() as session:
+            names = [random_name(rng) for _ in range(n)]
+            await session.execute(insert(User), [{"name": name} for name in names])
+            await session.commit()
+            repository = UserRepository(session)
+            terms = [rng.choice(names)[:3] for _ in range(queries)]
+            dialect = session.bind.dialect.name
+
+            await create_indexes(session, dialect)
+            await session.execute(text("ANALYZE"))
+            indexed = sorted(await timings(repository, terms))
+
+            await drop_indexes(session)
+            scanned = sorted(await timings(repository, terms))
+
+            await create_indexes(session, dialect)
+            await session.execute(delete(User))
+            await session.commit()
+
+        p = lambda values, q: values[min(len(values) - 1, int(len(values) * q))]
+        print(
+            f"{n:>7} {statistics.median(indexed):>12.2f} {p(indexed, 0.95):>12.2f}"
+            f" {statistics.median(scanned):>9.2f} {p(scanned, 0.95):>9.2f}"
+        )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--url", default="sqlite+aiosqlite:///:memory:")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.sizes, args.queries))
+
+
+if __name__ == "__main__":
+    main()
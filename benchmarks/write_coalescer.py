@@ -0,0 +1,94 @@
+"""
+Benchmark single-user insert throughput with and without write coalescing.
+
+N concurrent writers each insert rows one at a time, like concurrent
+POST /users requests:
+
+- direct:    own session per insert: UserRepository.create + COMMIT
+- coalesced: WriteCoalescer.insert (one multi-row INSERT ... RETURNING and
+             one COMMIT per batch)
+
+Runs on a temporary SQLite file unless --url points at a scratch database
+(rows are deleted afterwards).
+
+Usage:
+    python -m benchmarks.write_coalescer [--writers 1 50 500] [--rows 2000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.db.base import Base
+from app.core.db.write_coalescer import WriteCoalescer
+from app.modules.user.user_model import User
+from app.modules.user.user_repository import UserRepository
+
+
+async def run(url: str, writer_counts: List[int], rows: int, max_batch: int, max_delay_ms: float):
+    # SQLite allows one writer at a time; let the direct writers wait for the lock
+    connect_args = {"timeout": 300} if url.startswith("sqlite") else {}
+    engine = create_async_engine(url, pool_size=20, max_overflow=0, pool_timeout=300, connect_args=connect_args)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def direct(i: int):
+        async with Session() as session:
+            await UserRepository(session).create(User(name=f"User {i}"))
+            await session.commit()
+
+    header = f"{'writers':>8} {'direct rows/s':>14} {'coalesced rows/s':>17} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+
+    for writers in writer_counts:
+        results = {}
+        for name in ("direct", "coalesced"):
+            coalescer = WriteCoalescer(User, Session, max_batch=max_batch, max_delay=max_delay_ms / 1000)
+            insert_one = direct if name == "direct" else (lambda i: coalescer.insert({"name": f"User {i}"}))
+            per_writer = max(1, rows // writers)
+
+            async def writer(w: int):
+                for n in range(per_writer):
+                    await insert_one(w * per_writer + n)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(writer(w) for w in range(writers)))
+            await coalescer.close()
+            results[name] = per_writer * writers / (time.perf_counter() - started)
+
+            async with Session() as session:
+                await session.execute(delete(User))
+                await session.commit()
+
+        print(
+            f"{writers:>8} {results['direct']:>14.0f} {results['coalesced']:>17.0f}"
+            f" {results['coalesced'] / results['direct']:>7.1f}x"
+        )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--max-batch", type=int, default=100)
+    parser.add_argument("--max-delay-ms", type=float, default=5.0)
+    parser.add_argument("--url")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        asyncio.run(run(url, args.writers, args.rows, args.max_batch, args.max_delay_ms))
+
+
+if __name__ == "__main__":
+    main()
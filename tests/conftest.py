@@ -11,9 +11,17 @@ from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 
+import fakeredis
+
 from app.main import app
+from app.core.cache import redis, local_cache, backend as cache_backend
+from app.core.cache.backend import RedisBackend
+from app.core.cache.memory_backend import MemoryBackend
+from app.core.cache.stats import cache_stats
 from app.core.db.base import Base
+from app.core.db.unit_of_work import UnitOfWork
 from app.core.dependencies import get_db
+from app.modules.user.services import user_service
 
 
 # Test database URL (in-memory SQLite)
@@ -64,14 +72,27 @@ async def test_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 @pytest.fixture(scope="function")
-def client(test_db: AsyncSession) -> TestClient:
+def client(test_db: AsyncSession, monkeypatch) -> TestClient:
     """
     Create a test client with dependency overrides.
     
-    Uses the test database instead of the real one.
+    Uses the test database instead of the real one, for the request
+    session and for the sessions cache loads open (refresh_scope).
     """
+    monkeypatch.setattr(
+        user_service,
+        "AsyncSessionLocal",
+        async_sessionmaker(test_db.bind, class_=AsyncSession, expire_on_commit=False),
+    )
+
     async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
-        yield test_db
+        # Commit/roll back like get_db, so after-commit hooks (cache tag bumps) run
+        try:
+            yield test_db
+            await UnitOfWork(test_db).commit()
+        except Exception:
+            await test_db.rollback()
+            raise
     
     app.dependency_overrides[get_db] = override_get_db
     
@@ -87,3 +108,47 @@ def sample_user_data() -> dict:
     return {
         "name": "Test User",
         "description": "A test user for unit testing"
+    }
+
+
+@pytest.fixture
+def redis_server() -> fakeredis.FakeServer:
+    """In-process Redis stand-in; clients created on it share one keyspace."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def fake_redis(redis_server: fakeredis.FakeServer):
+    """Install a fake Redis client as the application's Redis client."""
+    client = fakeredis.FakeAsyncRedis(server=redis_server)
+    previous = redis.redis_client, cache_backend.backend
+    redis.redis_client = client
+    cache_backend.backend = RedisBackend(client)
+    yield client
+    redis.redis_client, cache_backend.backend = previous
+
+
+@pytest.fixture
+def memory_cache() -> MemoryBackend:
+    """Use the in-process cache backend instead of Redis."""
+    previous = cache_backend.backend
+    cache_backend.backend = MemoryBackend(max_bytes=1024 * 1024, max_items=1000)
+    yield cache_backend.backend
+    cache_backend.backend = previous
+
+
+@pytest.fixture
+def l1_cache():
+    """Enable the in-process L1 cache for the duration of a test."""
+    previous = local_cache.local_cache
+    local_cache.local_cache = local_cache.LocalCache(max_items=100, ttl=60)
+    yield local_cache.local_cache
+    local_cache.local_cache = previous
+
+
+@pytest.fixture
+def fresh_cache_stats():
+    """Start a test with empty cache statistics."""
+    cache_stats.reset()
+    yield cache_stats
+    cache_stats.reset()
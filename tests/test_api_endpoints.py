@@ -4,9 +4,18 @@ Integration tests for User API endpoints.
 These tests verify the full request/response cycle.
 """
 
+import asyncio
+import json
+import httpx
 import pytest
+import fakeredis
 from fastapi.testclient import TestClient
 
+from app.core.dependencies import get_db
+from app.main import app
+from app.modules.user.services.user_service import UserService
+from app.modules.user.user_schema import BulkCreateResult
+
 
 @pytest.mark.integration
 def test_create_user_endpoint(client: TestClient, sample_user_data: dict):
@@ -74,3 +83,272 @@ def test_request_id_in_response(client: TestClient):
     # Assert
     assert "X-Request-ID" in response.headers
     assert len(response.headers["X-Request-ID"]) > 0
+
+
+@pytest.mark.integration
+def test_list_cache_keys_is_paginated(client: TestClient, fake_redis, redis_server):
+    """Test that cache keys are listed page by page with a cursor."""
+    # Arrange
+    seed = fakeredis.FakeRedis(server=redis_server)
+    for i in range(25):
+        seed.set(f"users:detail:{i}", "{}")
+    seed.set("other:key", "{}")
+
+    # Act - follow the cursor until the listing completes
+    keys, cursor, pages = [], None, 0
+    while cursor != 0:
+        response = client.get(
+            "/api/v1/cache/",
+            params={"pattern": "users:*", "count": 10, "cursor": cursor or 0},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        keys.extend(data["keys"])
+        cursor = data["cursor"]
+        pages += 1
+
+    # Assert
+    assert sorted(keys) == sorted(f"users:detail:{i}" for i in range(25))
+    assert pages > 1
+
+
+@pytest.mark.integration
+def test_list_cache_keys_streams_ndjson(client: TestClient, fake_redis, redis_server):
+    """Test streaming every matching key as NDJSON."""
+    # Arrange
+    seed = fakeredis.FakeRedis(server=redis_server)
+    for i in range(5):
+        seed.set(f"users:detail:{i}", "{}")
+
+    # Act
+    response = client.get("/api/v1/cache/", params={"pattern": "users:*", "stream": True})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["key"] for line in lines) == sorted(f"users:detail:{i}" for i in range(5))
+
+
+@pytest.mark.integration
+def test_cache_stats_endpoint(client: TestClient, fake_redis, fresh_cache_stats):
+    """Test GET /api/v1/cache/stats."""
+    # Arrange
+    client.get("/api/v1/cache/", params={"key": "users:list"})
+
+    # Act
+    response = client.get("/api/v1/cache/stats")
+
+    # Assert
+    assert response.status_code == 200
+    data = response.json()
+    assert data["totals"]["misses"] == 1
+    assert "users:*" in data["prefixes"]
+
+
+@pytest.mark.integration
+def test_users_are_cached_without_redis(client: TestClient, memory_cache, fresh_cache_stats, sample_user_data: dict):
+    """Test that @cached works with the in-memory backend when Redis is disabled."""
+    # Arrange
+    client.post("/api/v1/users/", json=sample_user_data)
+
+    # Act
+    first = client.get("/api/v1/users/")
+    second = client.get("/api/v1/users/")
+    client.post("/api/v1/users/", json={"name": "Another User"})
+    third = client.get("/api/v1/users/")
+
+    # Assert
+    assert first.json() == second.json()
+    assert len(third.json()) == 2
+    assert fresh_cache_stats.snapshot()["prefixes"]["users:*"]["hits"] == 1
+
+
+@pytest.mark.integration
+def test_list_users_keyset_pagination(client: TestClient):
+    """Test walking the user list forwards and back with cursors."""
+    # Arrange
+    for i in range(5):
+        client.post("/api/v1/users/", json={"name": f"User {i}"})
+
+    # Act
+    first = client.get("/api/v1/users/", params={"limit": 2})
+    second = client.get("/api/v1/users/", params={"limit": 2, "cursor": first.headers["X-Next-Cursor"]})
+    third = client.get("/api/v1/users/", params={"limit": 2, "cursor": second.headers["X-Next-Cursor"]})
+    back = client.get("/api/v1/users/", params={"limit": 2, "cursor": second.headers["X-Prev-Cursor"]})
+
+    # Assert
+    assert [u["name"] for u in first.json()] == ["User 0", "User 1"]
+    assert [u["name"] for u in second.json()] == ["User 2", "User 3"]
+    assert [u["name"] for u in third.json()] == ["User 4"]
+    assert back.json() == first.json()
+    assert "X-Prev-Cursor" not in first.headers
+    assert "X-Next-Cursor" not in third.headers
+    assert 'rel="next"' in second.headers["Link"] and 'rel="prev"' in second.headers["Link"]
+
+
+@pytest.mark.integration
+def test_list_users_rejects_invalid_cursor(client: TestClient):
+    """Test that a malformed cursor is a 422, not a server error."""
+    # Act
+    response = client.get("/api/v1/users/", params={"cursor": "not-a-cursor"})
+
+    # Assert
+    assert response.status_code == 422
+
+
+@pytest.mark.integration
+def test_bulk_create_users_reports_row_errors(client: TestClient):
+    """Test bulk creation from a JSON array with an invalid row."""
+    # Arrange
+    rows = [{"name": "User 0"}, {"description": "No name"}, {"name": "User 2"}]
+
+    # Act
+    response = client.post("/api/v1/users/bulk", json=rows)
+    listed = client.get("/api/v1/users/")
+
+    # Assert
+    assert response.status_code == 201
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 1
+    assert [e["index"] for e in data["errors"]] == [1]
+    assert [u["id"] for u in listed.json()] == data["ids"]
+
+
+@pytest.mark.integration
+def test_bulk_create_users_from_ndjson(client: TestClient):
+    """Test bulk creation from a streamed NDJSON body."""
+    # Arrange
+    body = "\n".join(json.dumps({"name": f"User {i}"}) for i in range(3)) + "\n{not json}\n"
+
+    # Act
+    response = client.post(
+        "/api/v1/users/bulk",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    # Assert
+    assert response.status_code == 201
+    data = response.json()
+    assert data["created"] == 3
+    assert data["errors"][0]["index"] == 3
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_bulk_create_users_streams_ndjson_through_middleware(test_db, monkeypatch):
+    """Test that NDJSON rows reach the service before the upload has finished arriving."""
+    # Arrange
+    first_row_seen = asyncio.Event()
+    received = []
+
+    async def bulk_create_users(self, rows, return_ids=True):
+        async for row in rows:
+            received.append(row)
+            first_row_seen.set()
+        return BulkCreateResult(created=len(received), failed=0, ids=[])
+
+    async def body():
+        yield b'{"name": "User 0"}\n'
+        # Blocks forever if anything buffers the whole body before the route
+        await asyncio.wait_for(first_row_seen.wait(), 2)
+        yield b'{"name": "User 1"}\n'
+
+    async def override_get_db():
+        yield test_db
+
+    monkeypatch.setattr(UserService, "bulk_create_users", bulk_create_users)
+    app.dependency_overrides[get_db] = override_get_db
+
+    try:
+        # Act
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            response = await http.post(
+                "/api/v1/users/bulk",
+                content=body(),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    # Assert
+    assert response.status_code == 201
+    assert received == [b'{"name": "User 0"}', b'{"name": "User 1"}']
+
+
+@pytest.mark.integration
+def test_bulk_create_users_rejects_json_strings_in_array(client: TestClient):
+    """Test that string elements of a JSON array aren't parsed as JSON documents."""
+    # Act
+    response = client.post("/api/v1/users/bulk", json=['{"name": "x"}', {"name": "y"}])
+
+    # Assert
+    assert response.status_code == 201
+    data = response.json()
+    assert data["created"] == 1
+    assert [e["index"] for e in data["errors"]] == [0]
+
+
+@pytest.mark.integration
+def test_bulk_create_users_malformed_json(client: TestClient):
+    """Test that a body that isn't valid JSON is a 422, not a server error."""
+    # Act
+    response = client.post(
+        "/api/v1/users/bulk",
+        content=b'[{"name": "x"',
+        headers={"Content-Type": "application/json"},
+    )
+
+    # Assert
+    assert response.status_code == 422
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+def test_export_users_streams_every_user(client: TestClient, export_format: str):
+    """Test the streamed user export in both formats."""
+    # Arrange
+    client.post("/api/v1/users/bulk", json=[{"name": f"User {i}"} for i in range(3)])
+
+    # Act
+    response = client.get("/api/v1/users/export", params={"format": export_format})
+
+    # Assert
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    if export_format == "csv":
+        assert response.headers["content-type"].startswith("text/csv")
+        assert lines[0] == "id,name,description"
+        assert lines[1:] == ["1,User 0,", "2,User 1,", "3,User 2,"]
+    else:
+        assert [json.loads(line)["name"] for line in lines] == ["User 0", "User 1", "User 2"]
+
+
+@pytest.mark.integration
+def test_search_users_endpoint(client: TestClient):
+    """Test GET /api/v1/users/search."""
+    # Arrange
+    client.post("/api/v1/users/bulk", json=[{"name": "Alice"}, {"name": "Alfred"}, {"name": "Bob"}])
+
+    # Act
+    response = client.get("/api/v1/users/search", params={"q": "al", "limit": 1})
+
+    # Assert
+    assert response.status_code == 200
+    assert [u["name"] for u in response.json()] == ["Alice"]
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("q", [" ", "   "])
+def test_search_users_rejects_blank_term(client: TestClient, q: str):
+    """Test that a whitespace-only search term is a 422 instead of matching everyone."""
+    # Arrange
+    client.post("/api/v1/users/bulk", json=[{"name": "Alice"}, {"name": "Bob"}])
+
+    # Act
+    response = client.get("/api/v1/users/search", params={"q": q})
+
+    # Assert
+    assert response.status_code == 422
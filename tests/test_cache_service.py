@@ -0,0 +1,356 @@
+"""
+Unit tests for the cache layer.
+
+Redis is replaced by an in-process stand-in (fakeredis).
+"""
+
+import asyncio
+import pytest
+import fakeredis
+from typing import List
+from pydantic import TypeAdapter
+
+from app.core.cache import backend as cache_backend, invalidation, redis as cache_redis
+from app.core.cache.backend import GuardedBackend
+from app.core.cache.cache_service import CacheService
+from app.core.cache.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.core.cache.invalidation import CacheInvalidator
+from app.core.cache.local_cache import LocalCache
+from app.core.cache.memory_backend import MemoryBackend
+from app.core.cache.serializers import CODECS, COMPRESSIONS, CacheSerializer
+from app.modules.user.user_schema import UserRead
+
+
+async def wait_for(predicate, timeout: float = 2.0):
+    """Poll until `predicate()` is true (pub/sub delivery is asynchronous)."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.unit
+def test_local_cache_evicts_least_recently_used():
+    """Test that the L1 cache is bounded and evicts in LRU order."""
+    # Arrange
+    cache = LocalCache(max_items=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+
+    # Act
+    cache.set("c", 3)
+
+    # Assert
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+@pytest.mark.unit
+def test_local_cache_drops_writes_from_before_an_invalidation():
+    """Test that a value read before an invalidation is not re-inserted after it."""
+    # Arrange
+    cache = LocalCache(max_items=10, ttl=60)
+    epoch = cache.epoch
+
+    # Act
+    cache.delete(["users:list"])
+    cache.set("users:list", ["stale"], epoch=epoch)
+
+    # Assert
+    assert cache.get("users:list") is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_is_served_from_l1(fake_redis, l1_cache):
+    """Test that a repeated get does not go back to Redis."""
+    # Arrange
+    service = CacheService()
+    await fake_redis.set("users:list", '[{"id": 1}]')
+    assert await service.get("users:list") == [{"id": 1}]
+
+    # Act - remove the key behind the cache's back
+    await fake_redis.delete("users:list")
+
+    # Assert
+    assert await service.get("users:list") == [{"id": 1}]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_delete_invalidates_l1_on_other_workers(redis_server, fake_redis, l1_cache):
+    """Test that a delete in one worker drops the L1 entry in every worker."""
+    # Arrange - this worker plus a second one sharing the same Redis
+    other_cache = LocalCache(max_items=100, ttl=60)
+    other = CacheInvalidator("cache:invalidate", other_cache)
+    other_client = fakeredis.FakeAsyncRedis(server=redis_server)
+    other.start(other_client)
+
+    invalidation.invalidator = CacheInvalidator("cache:invalidate", l1_cache)
+    try:
+        await asyncio.sleep(0.05)  # let the subscription settle
+        other_cache.set("users:list", ["stale"])
+        service = CacheService()
+
+        # Act
+        await service.delete("users:list")
+
+        # Assert
+        await wait_for(lambda: other_cache.get("users:list") is None)
+    finally:
+        invalidation.invalidator = None
+        await other.stop()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_worker_ignores_its_own_invalidations(l1_cache):
+    """Test that the publishing worker keeps the value it just wrote."""
+    # Arrange
+    invalidator = CacheInvalidator("cache:invalidate", l1_cache)
+    l1_cache.set("users:list", ["fresh"])
+
+    # Act
+    invalidator.handle(invalidator.message(["users:list"]))
+
+    # Assert
+    assert l1_cache.get("users:list") == ["fresh"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_invalidation_listener_client_has_no_read_timeout(monkeypatch):
+    """Test that the pub/sub client can block waiting for messages, unlike the cache client."""
+    # Arrange
+    monkeypatch.setattr(cache_redis.settings, "redis_url", "redis://localhost:6379/0")
+
+    # Act
+    client = cache_redis.pubsub_client()
+
+    # Assert
+    try:
+        assert client.connection_pool.connection_kwargs.get("socket_timeout") is None
+        assert client.connection_pool.connection_kwargs["health_check_interval"] > 0
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("codec", CODECS)
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_serializer_round_trips_every_format(codec: str, compression: str):
+    """Test that each codec/compression pair decodes back, including into models."""
+    # Arrange
+    writer = CacheSerializer(codec, compression, compress_threshold=64)
+    reader = CacheSerializer()  # decoding follows the header, not the reader's settings
+    users = [{"id": i, "name": f"User {i}", "description": None} for i in range(50)]
+
+    # Act
+    payload = writer.dumps(users)
+
+    # Assert
+    assert reader.loads(payload) == users
+    models = reader.loads_as(payload, TypeAdapter(List[UserRead]))
+    assert models[3] == UserRead(id=3, name="User 3", description=None)
+
+
+@pytest.mark.unit
+def test_serializer_reads_legacy_json_payloads():
+    """Test that headerless JSON written before codecs existed still decodes."""
+    # Arrange
+    serializer = CacheSerializer("msgpack", "zlib")
+
+    # Act / Assert
+    assert serializer.loads(b'[{"id": 1}]') == [{"id": 1}]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_multi_key_operations(fake_redis):
+    """Test set_many/get_many/delete_many, including per-key expiry."""
+    # Arrange
+    service = CacheService()
+
+    # Act
+    await service.set_many({"users:detail:1": {"id": 1}, "users:detail:2": {"id": 2}}, ttl=30)
+    values = await service.get_many(["users:detail:1", "users:detail:3", "users:detail:2"])
+    ttl = await fake_redis.ttl("users:detail:2")
+    await service.delete_many(["users:detail:1", "users:detail:2"])
+
+    # Assert
+    assert values == [{"id": 1}, None, {"id": 2}]
+    assert 0 < ttl <= 30
+    assert await service.get_many(["users:detail:1", "users:detail:2"]) == [None, None]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_pipeline_sends_queued_writes_on_exit(fake_redis, l1_cache):
+    """Test that pipelined writes land together and keep L1 coherent."""
+    # Arrange
+    service = CacheService()
+    await service.set("users:list", ["old"])
+
+    # Act
+    async with service.pipeline() as pipe:
+        pipe.set("users:detail:1", {"id": 1})
+        pipe.delete("users:list")
+        assert await fake_redis.exists("users:detail:1") == 0  # nothing sent yet
+
+    # Assert
+    assert await service.get("users:detail:1") == {"id": 1}
+    assert await service.get("users:list") is None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stats_are_recorded_per_key_prefix(fake_redis, l1_cache, fresh_cache_stats):
+    """Test hit/miss/set counters and histograms grouped by prefix."""
+    # Arrange
+    service = CacheService()
+
+    # Act
+    await service.get("users:list")           # miss
+    await service.set("users:list", [1, 2])   # set
+    await service.get("users:list")           # L1 hit
+    await service.get_many(["orders:1", "orders:2"])  # two misses, one round trip
+
+    # Assert
+    stats = fresh_cache_stats.snapshot()
+    users = stats["prefixes"]["users:*"]
+    assert (users["hits"], users["l1_hits"], users["misses"], users["sets"]) == (1, 1, 1, 1)
+    assert users["hit_ratio"] == 0.5
+    assert users["payload_bytes"]["count"] == 1
+    assert stats["prefixes"]["orders:*"]["misses"] == 2
+    assert stats["prefixes"]["orders:*"]["latency_ms"]["count"] == 1
+    assert stats["totals"]["misses"] == 3
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_memory_backend_serves_cache_service(memory_cache):
+    """Test the CacheService API end to end without Redis."""
+    # Arrange
+    service = CacheService()
+
+    # Act
+    await service.set_many({"users:detail:1": {"id": 1}, "users:detail:2": {"id": 2}}, ttl=30)
+    await service.invalidate_tags("users")
+    token = await service.acquire_lock("users:list", timeout=5)
+
+    # Assert
+    assert await service.get_many(["users:detail:1", "users:detail:2"]) == [{"id": 1}, {"id": 2}]
+    assert await service.get_generations(["users"]) == [1]
+    assert token and await service.acquire_lock("users:list", timeout=5) is None
+    assert sorted(await service.list_keys("users:*")) == ["users:detail:1", "users:detail:2"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_lru_within_memory_cap():
+    """Test LRU eviction under the byte cap, keeping entries without a TTL."""
+    # Arrange - room for roughly three 200-byte entries
+    backend = MemoryBackend(max_bytes=900, max_items=100)
+    batch = backend.batch()
+    batch.incr("gen:users")
+    batch.set("a", b"x" * 200, 60)
+    batch.set("b", b"x" * 200, 60)
+    await batch.execute()
+    await backend.get("a")  # "b" is now least recently used
+
+    # Act
+    batch = backend.batch()
+    batch.set("c", b"x" * 200, 60)
+    batch.set("d", b"x" * 200, 60)
+    await batch.execute()
+
+    # Assert
+    assert backend.used_bytes <= 900
+    assert await backend.get("b") is None
+    assert await backend.get("d") is not None
+    assert await backend.get("gen:users") == b"1"
+
+
+class SlowBackend(MemoryBackend):
+    """In-memory backend whose reads hang, like an overloaded Redis."""
+
+    async def get(self, key):
+        await asyncio.sleep(1)
+        return await super().get(key)
+
+
+@pytest.mark.unit
+def test_circuit_breaker_opens_and_probes_after_cool_down():
+    """Test the closed -> open -> half-open -> closed cycle."""
+    # Arrange
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0, slow_call_threshold=0.1)
+
+    # Act - a slow call counts as a failure
+    breaker.record_failure("timeout")
+    breaker.record_success(elapsed=0.5)
+
+    # Assert
+    assert breaker.state == OPEN
+    assert breaker.allow() is True  # the single half-open probe
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is False
+    breaker.record_success(elapsed=0.01)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["times_opened"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cancelled_half_open_probe_frees_the_probe_slot():
+    """Test that a cancelled probe doesn't leave the circuit stuck half-open."""
+    # Arrange
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure("timeout")
+    guarded = GuardedBackend(SlowBackend(), breaker, timeout=5)
+
+    # Act - the probe is cancelled while waiting on the backend
+    probe = asyncio.ensure_future(guarded.get("users:list"))
+    await asyncio.sleep(0.01)
+    assert breaker.state == HALF_OPEN
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    # Assert - the next call is let through as a new probe
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+    breaker.record_success(elapsed=0.01)
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_slow_backend_degrades_to_misses(fresh_cache_stats):
+    """Test that timeouts open the circuit and cache calls stop waiting on the backend."""
+    # Arrange
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60)
+    guarded = GuardedBackend(SlowBackend(), breaker, timeout=0.05)
+    previous, cache_backend.backend = cache_backend.backend, guarded
+    service = CacheService()
+
+    try:
+        # Act
+        await service.set("users:list", [1, 2])
+        first = await service.get("users:list")
+        second = await service.get("users:list")
+        started = asyncio.get_running_loop().time()
+        third = await service.get("users:list")
+        elapsed = asyncio.get_running_loop().time() - started
+        token = await service.acquire_lock("users:list", timeout=1)
+    finally:
+        cache_backend.backend = previous
+
+    # Assert
+    assert first is second is third is None
+    assert breaker.state == OPEN
+    assert elapsed < 0.05  # refused without touching the backend
+    assert fresh_cache_stats.snapshot()["totals"]["errors"] == 2
+    assert token == ""  # no coordination possible: the caller loads itself
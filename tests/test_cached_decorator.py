@@ -0,0 +1,269 @@
+"""
+Unit tests for the @cached decorator's stampede protection.
+"""
+
+import asyncio
+import time
+import pytest
+from contextlib import asynccontextmanager
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.cache.cache_service import CacheService
+from app.core.db.unit_of_work import UnitOfWork
+from app.core.decorators.cached import cached, cached_many, invalidates
+
+
+class CountingService:
+    """Minimal service whose loader counts how often it actually runs."""
+
+    def __init__(self, cache_service: CacheService, delay: float = 0.05):
+        self.cache_service = cache_service
+        self.delay = delay
+        self.calls = 0
+
+    async def _load(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"version": self.calls}
+
+    @cached(key_builder=lambda *args, **kwargs: "items:plain", ttl=60, lock_timeout=1)
+    async def get_plain(self):
+        return await self._load()
+
+    @cached(key_builder=lambda *args, **kwargs: "items:swr", ttl=60, stale_ttl=60)
+    async def get_swr(self):
+        return await self._load()
+
+
+class ScopedService(CountingService):
+    """Same service, but able to refresh in the background."""
+
+    @asynccontextmanager
+    async def refresh_scope(self):
+        yield self
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load(fake_redis):
+    """Test that simultaneous misses for a key run the loader once."""
+    # Arrange
+    service = CountingService(CacheService())
+
+    # Act
+    results = await asyncio.gather(*(service.get_plain() for _ in range(20)))
+
+    # Assert
+    assert service.calls == 1
+    assert all(r == {"version": 1} for r in results)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_lock_loser_waits_for_other_process(fake_redis):
+    """Test that a caller that loses the Redis lock uses the holder's value."""
+    # Arrange - another process holds the lock and is loading
+    cache = CacheService()
+    token = await cache.acquire_lock("items:plain", timeout=5)
+    service = CountingService(cache)
+
+    async def other_process_finishes():
+        await asyncio.sleep(0.1)
+        await cache.set("items:plain", {"version": 99})
+        await cache.release_lock("items:plain", token)
+
+    # Act
+    result, _ = await asyncio.gather(service.get_plain(), other_process_finishes())
+
+    # Assert
+    assert result == {"version": 99}
+    assert service.calls == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stale_value_served_while_refreshing_in_background(fake_redis):
+    """Test stale-while-revalidate with a background refresh."""
+    # Arrange - an entry whose soft expiry has passed
+    cache = CacheService()
+    await cache.set("items:swr", {"v": {"version": 0}, "exp": time.time() - 1, "delta": 0.0}, ttl=60)
+    service = ScopedService(cache)
+
+    # Act
+    first = await asyncio.gather(*(service.get_swr() for _ in range(5)))
+    await asyncio.sleep(service.delay * 4)
+    second = await service.get_swr()
+
+    # Assert
+    assert all(r == {"version": 0} for r in first)
+    assert second == {"version": 1}
+    assert service.calls == 1
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_stale_value_refreshed_inline_without_refresh_scope(fake_redis):
+    """Test that one caller refreshes inline while the others get the stale value."""
+    # Arrange
+    cache = CacheService()
+    await cache.set("items:swr", {"v": {"version": 0}, "exp": time.time() - 1, "delta": 0.0}, ttl=60)
+    service = CountingService(cache)
+
+    # Act
+    refreshing = asyncio.ensure_future(service.get_swr())
+    await asyncio.sleep(0)
+    others = await asyncio.gather(*(service.get_swr() for _ in range(5)))
+
+    # Assert
+    assert await refreshing == {"version": 1}
+    assert all(r == {"version": 0} for r in others)
+    assert service.calls == 1
+
+
+class BatchService:
+    """Service with a batch loader that records which ids it was asked for."""
+
+    def __init__(self, cache_service: CacheService):
+        self.cache_service = cache_service
+        self.requested = []
+
+    @cached_many(key_builder=lambda i: f"items:detail:{i}", ttl=60)
+    async def get_many(self, ids):
+        self.requested.append(list(ids))
+        return {i: {"id": i} for i in ids if i != 404}
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_cached_many_loads_only_misses(fake_redis):
+    """Test that a batch lookup loads only uncached ids, in one call."""
+    # Arrange
+    service = BatchService(CacheService())
+    await service.get_many([1, 2])
+
+    # Act
+    result = await service.get_many([3, 1, 404, 2, 3])
+
+    # Assert
+    assert service.requested == [[1, 2], [3, 404]]
+    assert list(result) == [3, 1, 2]
+    assert result[3] == {"id": 3}
+
+
+class SessionBoundService(CountingService):
+    """Service whose loads fail once its request-scoped session is closed."""
+
+    def __init__(self, cache_service: CacheService, delay: float = 0.05):
+        super().__init__(cache_service, delay)
+        self.session = object()
+        self.closed = False
+
+    async def _load(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.closed:
+            raise RuntimeError("session closed")
+        return {"version": self.calls}
+
+    @asynccontextmanager
+    async def refresh_scope(self):
+        yield SessionBoundService(self.cache_service, self.delay)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_shared_load_survives_the_first_caller_going_away(fake_redis):
+    """Test that a cancelled first caller's session teardown doesn't fail the callers sharing its load."""
+    # Arrange
+    first = SessionBoundService(CacheService())
+    second = SessionBoundService(first.cache_service)
+    first_call = asyncio.create_task(first.get_plain())
+    await asyncio.sleep(0.01)
+    second_call = asyncio.create_task(second.get_plain())
+    await asyncio.sleep(0.01)
+
+    # Act - the first request disconnects and get_db closes its session
+    first_call.cancel()
+    first.closed = True
+    result = await second_call
+
+    # Assert
+    assert result == {"version": 1}
+    assert first.calls == 0 and second.calls == 0
+
+
+class TaggedService(CountingService):
+    """Service whose list variants share a tag."""
+
+    @cached(key_builder=lambda self, page: f"items:page:{page}", ttl=60, tags=["items"])
+    async def get_page(self, page: int):
+        return await self._load()
+
+    @invalidates(invalidate_tags=["items"])
+    async def add_item(self):
+        return None
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_invalidating_a_tag_orphans_every_variant(fake_redis):
+    """Test that one tag bump invalidates all keys derived from it."""
+    # Arrange
+    service = TaggedService(CacheService(), delay=0)
+    await service.get_page(1)
+    await service.get_page(2)
+    assert service.calls == 2
+
+    # Act
+    await service.add_item()
+    await service.get_page(1)
+    await service.get_page(2)
+
+    # Assert
+    assert service.calls == 4
+    assert await fake_redis.get("gen:items") == b"1"
+    # Old generation's keys are left to expire on their own
+    assert await fake_redis.exists("items:page:1:v0") == 1
+    assert await fake_redis.exists("items:page:1:v1") == 1
+
+
+class TransactionalTaggedService(TaggedService):
+    """Tagged service whose writes go through a database session."""
+
+    def __init__(self, cache_service: CacheService, session):
+        super().__init__(cache_service, delay=0)
+        self.session = session
+
+    @invalidates(invalidate_tags=["items"])
+    async def add_item(self):
+        await self.session.execute(text("SELECT 1"))
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_tags_are_bumped_only_after_commit(fake_redis):
+    """Test that invalidation waits for the session to commit, and is dropped on rollback."""
+    # Arrange
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        async with AsyncSession(engine) as session:
+            service = TransactionalTaggedService(CacheService(), session)
+
+            # Act
+            await service.add_item()
+            before_commit = await fake_redis.get("gen:items")
+            await UnitOfWork(session).commit()
+            after_commit = await fake_redis.get("gen:items")
+
+            await service.add_item()
+            await session.rollback()
+            await asyncio.sleep(0.01)
+            after_rollback = await fake_redis.get("gen:items")
+    finally:
+        await engine.dispose()
+
+    # Assert
+    assert before_commit is None
+    assert after_commit == b"1"
+    assert after_rollback == b"1"
@@ -49,7 +49,7 @@ async def test_get_users(test_db: AsyncSession, sample_user_data: dict):
     user1 = UserCreate(**sample_user_data)
     user2 = UserCreate(name="Another User", description="Another test user")
     
-await service.create_user(user1)
+    await service.create_user(user1)
     await service.create_user(user2)
     await test_db.commit()
     
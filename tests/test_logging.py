@@ -0,0 +1,93 @@
+"""
+Unit tests for the queued logging pipeline.
+"""
+
+import json
+import logging
+import queue
+import pytest
+
+from app.core.config.settings import settings
+from app.core.logging.handlers import BoundedQueueHandler
+from app.core.logging.logger import add_to_log, flush_logs
+
+
+def _logger(name: str, handler: BoundedQueueHandler) -> logging.Logger:
+    logger = logging.getLogger(f"test.{name}")
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+@pytest.mark.unit
+def test_drop_policy_discards_records_when_full():
+    """Test that a full queue drops records without blocking the caller."""
+    # Arrange
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), policy="drop")
+    logger = _logger("drop", handler)
+
+    # Act
+    for n in range(5):
+        logger.info("message %d", n)
+
+    # Assert
+    assert handler.queue.qsize() == 2
+    assert handler.counters == {"enqueued": 2, "dropped": 3, "sampled_out": 0}
+
+
+@pytest.mark.unit
+def test_sample_policy_keeps_errors_and_some_info():
+    """Test that sampling thins out info records under pressure but keeps errors."""
+    # Arrange: half full from the start
+    handler = BoundedQueueHandler(queue.Queue(maxsize=100), policy="sample", block_timeout=0.01, sample_rate=10)
+    logger = _logger("sample", handler)
+    for _ in range(50):
+        handler.queue.put_nowait(None)
+
+    # Act
+    for n in range(30):
+        logger.info("info %d", n)
+    logger.error("error")
+
+    # Assert
+    assert handler.counters["sampled_out"] == 27
+    assert handler.counters["enqueued"] == 4
+    assert [r.getMessage() for r in list(handler.queue.queue)[50:]][-1] == "error"
+
+
+@pytest.mark.unit
+def test_queued_record_keeps_message_and_traceback():
+    """Test that records are resolved when queued, not when written."""
+    # Arrange
+    handler = BoundedQueueHandler(queue.Queue(maxsize=10))
+    logger = _logger("prepare", handler)
+    args = {"n": 1}
+
+    # Act
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logger.exception("failed with %s", args, extra={"request_id": "abc"})
+    args["n"] = 2
+
+    # Assert
+    record = handler.queue.get_nowait()
+    assert record.getMessage() == "failed with {'n': 1}"
+    assert record.exc_info is None
+    assert "RuntimeError: boom" in record.exc_text
+    assert record.request_id == "abc"
+
+
+@pytest.mark.unit
+def test_add_to_log_is_written_by_listener():
+    """Test that add_to_log returns at once and the listener writes the JSON line."""
+    # Act
+    add_to_log("error", "queued logging test", show_in_terminal=False, request_id="r-1")
+    assert flush_logs(timeout=5)
+
+    # Assert
+    with open(f"{settings.log_dir}/error.log") as f:
+        entries = [json.loads(line) for line in f if "queued logging test" in line]
+    assert entries[-1]["level"] == "ERROR"
+    assert entries[-1]["extra"] == {"request_id": "r-1"}
@@ -0,0 +1,91 @@
+"""
+Unit tests for the notification delivery limits.
+"""
+
+import asyncio
+import time
+import pytest
+
+from app.modules.notification.services.throttling import ChannelLimiter, EmailDigest
+
+
+class Recorder:
+    """Provider call stand-in that records its calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, **args):
+        self.calls.append(args)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_token_bucket_throttles_past_the_burst():
+    """Test that sends beyond the burst wait for tokens at the configured rate."""
+    # Arrange
+    limiter = ChannelLimiter("email", rate=50, burst=5, concurrency=10)
+    send = Recorder()
+
+    # Act
+    started = time.perf_counter()
+    await asyncio.gather(*(limiter.send(lambda: send(n=n)) for n in range(10)))
+    elapsed = time.perf_counter() - started
+
+    # Assert: 5 from the burst, 5 more at 50/s
+    assert len(send.calls) == 10
+    assert elapsed >= 0.09
+    assert limiter.counters["sent"] == 10
+    assert limiter.counters["throttled"] == 5
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_channel_limiter_caps_concurrent_sends():
+    """Test that no more than `concurrency` sends are in flight at once."""
+    # Arrange
+    limiter = ChannelLimiter("sms", rate=0, burst=1, concurrency=2)
+    peak = 0
+
+    async def send():
+        nonlocal peak
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+
+    # Act
+    await asyncio.gather(*(limiter.send(send) for _ in range(6)))
+
+    # Assert
+    assert peak == 2
+    assert limiter.counters["sent"] == 6
+    assert limiter.counters["throttled"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_email_digest_merges_same_recipient_and_subject():
+    """Test that emails within the digest window go out as one per recipient/subject."""
+    # Arrange
+    sent = []
+
+    async def send_email(recipient, subject, body):
+        sent.append((recipient, subject, body))
+
+    limiter = ChannelLimiter("email", rate=0, burst=1, concurrency=5)
+    digest = EmailDigest(0.05, 100, send_email, limiter)
+
+    # Act
+    await asyncio.gather(
+        digest.add("admin@example.com", "New User Created", "User 'a'"),
+        digest.add("admin@example.com", "New User Created", "User 'b'"),
+        digest.add("admin@example.com", "New User Created", "User 'c'"),
+        digest.add("ops@example.com", "New User Created", "User 'a'"),
+    )
+
+    # Assert
+    assert sorted(sent) == [
+        ("admin@example.com", "New User Created (3 notifications)", "User 'a'\n\nUser 'b'\n\nUser 'c'"),
+        ("ops@example.com", "New User Created", "User 'a'"),
+    ]
+    assert limiter.counters["sent"] == 2
+    assert limiter.counters["merged"] == 2
@@ -0,0 +1,199 @@
+"""
+Tests for the notification outbox and its dispatcher.
+
+Runs against a SQLite file so sessions opened by the dispatcher see what
+the test committed.
+"""
+
+import asyncio
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.db.base import Base
+from app.modules.notification.outbox_dispatcher import OutboxDispatcher
+from app.modules.notification.outbox_model import DONE, FAILED, PENDING, OutboxMessage
+from app.modules.notification.outbox_repository import OutboxRepository
+from app.modules.user.services.user_service import UserService
+from app.modules.user.user_schema import UserCreate
+
+
+class RecordingNotifications:
+    """Delivery stand-in: records emails, failing for recipients in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    async def send_email(self, recipient: str, subject: str, body: str):
+        if recipient in self.failing:
+            raise ConnectionError("SMTP unavailable")
+        self.sent.append((recipient, subject))
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'outbox.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _messages(session_factory):
+    async with session_factory() as session:
+        return (await session.execute(select(OutboxMessage).order_by(OutboxMessage.id))).scalars().all()
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_create_user_writes_outbox_row_in_same_transaction(session_factory):
+    """Test that the notification commits and rolls back with the user."""
+    # Arrange
+    async with session_factory() as session:
+        service = UserService(session, notification_service=None, cache_service=None)
+
+        # Act
+        await service.create_user(UserCreate(name="Rolled Back"))
+        await session.rollback()
+        await service.create_user(UserCreate(name="Committed"))
+        await session.commit()
+
+    # Assert
+    messages = await _messages(session_factory)
+    assert len(messages) == 1
+    assert messages[0].kind == "email"
+    assert messages[0].status == PENDING
+    assert "Committed" in messages[0].payload["body"]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_outbox_claim_skips_claimed_rows(session_factory):
+    """Test that consecutive claims hand out each due message once."""
+    # Arrange
+    async with session_factory() as session:
+        repository = OutboxRepository(session)
+        for n in range(3):
+            await repository.add("email", recipient=f"{n}@example.com", subject="s", body="b")
+        await session.commit()
+
+    # Act
+    async with session_factory() as session:
+        first = await OutboxRepository(session).claim(2, lease=60)
+        second = await OutboxRepository(session).claim(2, lease=60)
+        third = await OutboxRepository(session).claim(2, lease=60)
+        await session.commit()
+
+    # Assert
+    assert [m["payload"]["recipient"] for m in first] == ["0@example.com", "1@example.com"]
+    assert [m["payload"]["recipient"] for m in second] == ["2@example.com"]
+    assert third == []
+    assert all(m["attempts"] == 1 for m in first + second)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_outbox_dispatcher_delivers_and_retries(session_factory):
+    """Test that delivered messages are marked done and failing ones retried, then failed."""
+    # Arrange
+    async with session_factory() as session:
+        repository = OutboxRepository(session)
+        await repository.add("email", recipient="ok@example.com", subject="Hi", body="b")
+        await repository.add("email", recipient="down@example.com", subject="Hi", body="b")
+        await session.commit()
+
+    notifications = RecordingNotifications(failing={"down@example.com"})
+    dispatcher = OutboxDispatcher(session_factory, notifications, max_attempts=2, retry_backoff=0)
+
+    # Act
+    await dispatcher.dispatch_batch()
+    await dispatcher.dispatch_batch()  # the retry
+    idle = await dispatcher.dispatch_batch()
+
+    # Assert
+    messages = await _messages(session_factory)
+    assert notifications.sent == [("ok@example.com", "Hi")]
+    assert [m.status for m in messages] == [DONE, FAILED]
+    assert messages[1].attempts == 2
+    assert "SMTP unavailable" in messages[1].last_error
+    assert idle == 0
+
+    stats = await dispatcher.snapshot()
+    assert stats["delivered"] == 1
+    assert stats["retried"] == 1
+    assert stats["failed"] == 1
+    assert stats["pending"] == 0
+    assert stats["lag_ms"]["max"] is not None
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_outbox_dispatcher_wakes_on_commit(session_factory):
+    """Test that a committed outbox row is delivered without waiting for the next poll."""
+    # Arrange
+    notifications = RecordingNotifications()
+    dispatcher = OutboxDispatcher(session_factory, notifications, poll_interval=60)
+    dispatcher.start()
+    await asyncio.sleep(0.05)  # first (empty) poll done; now waiting
+
+    try:
+        # Act
+        async with session_factory() as session:
+            await OutboxRepository(session).add("email", recipient="a@example.com", subject="Hi", body="b")
+            await session.commit()
+        for _ in range(100):
+            if notifications.sent:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await dispatcher.stop()
+
+    # Assert
+    assert notifications.sent == [("a@example.com", "Hi")]
+
+
+class DigestNotifications(RecordingNotifications):
+    """Digest-mode stand-in: emails are held until `flush` resolves their future."""
+
+    def __init__(self):
+        super().__init__()
+        self.digest = None
+
+    def submit_email(self, recipient: str, subject: str, body: str):
+        if self.digest is None:
+            self.digest = asyncio.get_running_loop().create_future()
+        return self.digest
+
+    def flush(self):
+        self.digest.set_result(None)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_outbox_dispatcher_settles_digested_emails_on_flush(session_factory):
+    """Test that digested emails don't hold the batch and are marked done when the digest is sent."""
+    # Arrange
+    async with session_factory() as session:
+        repository = OutboxRepository(session)
+        await repository.add("email", recipient="a@example.com", subject="Hi", body="1")
+        await repository.add("email", recipient="a@example.com", subject="Hi", body="2")
+        await session.commit()
+
+    notifications = DigestNotifications()
+    dispatcher = OutboxDispatcher(session_factory, notifications, concurrency=1)
+
+    # Act
+    claimed = await asyncio.wait_for(dispatcher.dispatch_batch(), 1)
+    before = [m.status for m in await _messages(session_factory)]
+    notifications.flush()
+    for _ in range(100):
+        if (await dispatcher.snapshot())["delivered"] == 2:
+            break
+        await asyncio.sleep(0.01)
+
+    # Assert
+    assert claimed == 2
+    assert DONE not in before
+    assert [m.status for m in await _messages(session_factory)] == [DONE, DONE]
+    assert (await dispatcher.snapshot())["in_digest"] == 0
@@ -0,0 +1,359 @@
+"""
+Unit tests for the repository layer.
+"""
+
+import asyncio
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError, TimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config.settings import settings
+from app.core.db import query_stats
+from app.core.db.base import Base
+from app.core.db.query_stats import fingerprint
+from app.core.db.write_coalescer import WriteCoalescer
+from app.core.db.unit_of_work import UnitOfWork, reset_unit_of_work, set_unit_of_work
+from app.core.decorators.transactional import transactional
+from app.core.dependencies import get_db
+from app.core.db.routing import ReplicaSet, RoutingSession, primary_only
+
+from app.core.db import session as db_session
+from app.core.db.pool import InstrumentedQueuePool, PoolStats, pool_stats
+from app.core.db.session import engine_options
+
+from app.modules.user.user_model import User
+from app.modules.user.user_repository import UserRepository
+from app.modules.user.user_schema import UserRead
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_create_and_update_take_one_statement_each(test_db: AsyncSession):
+    """Test that server-generated columns come back without a refresh SELECT."""
+    # Arrange
+    repository = UserRepository(test_db)
+    statements = []
+    engine = test_db.bind.sync_engine
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+
+    try:
+        # Act
+        user = await repository.create(User(name="Test User"))
+        created = list(statements)
+        statements.clear()
+        await repository.update(user, description="Updated")
+        updated = list(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    # Assert
+    assert len(created) == 1 and "RETURNING" in created[0]
+    assert len(updated) == 1 and "RETURNING" in updated[0]
+    assert user.id is not None and user.created_at is not None
+    assert user.description == "Updated"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_pool_stats_track_checkouts_and_timeouts(tmp_path):
+    """Test pool instrumentation on an exhausted single-connection pool."""
+    # Arrange
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    pool_stats.reset()
+    pool_stats.attach(engine)
+
+    try:
+        # Act
+        async with engine.connect():
+            with pytest.raises(TimeoutError):
+                async with engine.connect():
+                    pass
+            busy = pool_stats.snapshot(engine.sync_engine.pool)
+        idle = pool_stats.snapshot(engine.sync_engine.pool)
+    finally:
+        await engine.dispose()
+        pool_stats.reset()
+
+    # Assert
+    assert busy["checked_out"] == 1 and busy["size"] == 1
+    assert busy["timeouts"] == 1
+    assert busy["wait_ms"]["count"] == 2
+    assert idle["checked_out"] == 0 and idle["max_checked_out"] == 1
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("cache_size", [100, 0])
+def test_asyncpg_engine_options_size_both_statement_caches(monkeypatch, cache_size):
+    """Test that DB_STATEMENT_CACHE_SIZE reaches asyncpg's and SQLAlchemy's statement caches."""
+    # Arrange
+    monkeypatch.setattr(settings, "db_statement_cache_size", cache_size)
+
+    # Act
+    connect_args = engine_options("postgresql+asyncpg://app@db/app")["connect_args"]
+
+    # Assert
+    assert connect_args["statement_cache_size"] == cache_size
+    assert connect_args["prepared_statement_cache_size"] == cache_size
+    if cache_size == 0:
+        name = connect_args["prepared_statement_name_func"]
+        assert name() != name()
+    else:
+        assert "prepared_statement_name_func" not in connect_args
+
+
+@pytest.fixture
+async def primary_and_replica(tmp_path):
+    """Two SQLite files standing in for a primary and its replica."""
+    engines = []
+    for name in ("primary", "replica"):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add(User(name=f"{name} user"))
+            await session.commit()
+        engines.append(engine)
+
+    yield engines
+
+    for engine in engines:
+        await engine.dispose()
+
+
+async def _names(session) -> list:
+    return [u.name for u in await UserRepository(session).get_all()]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_read_only_queries_are_routed_to_replica(primary_and_replica):
+    """Test replica routing, primary stickiness after writes and inside primary_only."""
+    # Arrange
+    primary, replica = primary_and_replica
+    replicas = ReplicaSet([replica])
+    Session = async_sessionmaker(primary, sync_session_class=RoutingSession, replicas=replicas)
+
+    # Act
+    async with Session() as session:
+        declared_read = await _names(session)
+        await UserRepository(session).create(User(name="new user"))
+        after_write = await _names(session)
+    async with Session() as session:
+        with primary_only():
+            forced = await _names(session)
+    replicas.replicas[0].mark_down("connection refused")
+    async with Session() as session:
+        replica_down = await _names(session)
+
+    # Assert
+    assert declared_read == ["replica user"]
+    assert after_write == ["primary user", "new user"]
+    assert forced == ["primary user"]
+    assert replica_down == ["primary user"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_replica_pool_stats_are_kept_apart_from_the_primary(tmp_path):
+    """Test that checkouts on a replica's pool are counted under that replica, not the primary."""
+    # Arrange
+    replica = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    pool_stats.reset()
+    replicas = ReplicaSet([replica])
+
+    try:
+        # Act
+        async with replica.connect():
+            pass
+        snapshot = replicas.pool_snapshot()
+    finally:
+        await replica.dispose()
+
+    # Assert
+    assert snapshot[0]["pool"] == replicas.replicas[0].name
+    assert snapshot[0]["checkouts"] == 1 and snapshot[0]["wait_ms"]["count"] == 1
+    assert pool_stats.checkouts == 0 and pool_stats.wait.snapshot()["count"] == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_get_db_creates_the_session_on_first_use(tmp_path, monkeypatch):
+    """Test that an unused request session never checks out a connection."""
+    # Arrange - get_db's sessions come from a test engine with its own pool stats
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lazy.db'}", poolclass=InstrumentedQueuePool)
+    stats = PoolStats("test")
+    stats.attach(engine)
+    monkeypatch.setattr(db_session, "AsyncSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+
+    try:
+        # Act
+        unused = get_db()
+        untouched = await unused.__anext__()
+        await unused.aclose()
+
+        used = get_db()
+        session = await used.__anext__()
+        await session.execute(text("SELECT 1"))
+        with pytest.raises(StopAsyncIteration):
+            await used.__anext__()
+    finally:
+        await engine.dispose()
+
+    # Assert
+    assert not untouched.started
+    assert session.started and not session.in_transaction()
+    assert stats.checkouts == 1
+
+
+@pytest.mark.unit
+def test_fingerprint_ignores_literals_and_list_lengths():
+    """Test that statements differing only in values share a fingerprint."""
+    # Assert
+    assert fingerprint("SELECT * FROM users WHERE id IN (?, ?, ?)") == fingerprint(
+        "SELECT *  FROM users\nWHERE id IN ($1, $2)"
+    )
+    assert fingerprint("SELECT 1 WHERE name = 'a'") == "SELECT ? WHERE name = ?"
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_request_query_stats_flag_n_plus_one(test_db: AsyncSession, monkeypatch):
+    """Test per-request statement counting and N+1 detection."""
+    # Arrange
+    monkeypatch.setattr(settings, "db_n_plus_one_threshold", 3)
+    query_stats.attach(test_db.bind)
+    stats = query_stats.start_request_stats()
+    repository = UserRepository(test_db)
+
+    try:
+        # Act - one lookup per id instead of one query for all of them
+        for i in range(4):
+            await test_db.execute(text("SELECT * FROM users WHERE id = :id"), {"id": i})
+        await repository.get_by_ids([1, 2, 3])
+        summary = stats.summary()
+    finally:
+        query_stats.detach(test_db.bind)
+
+    # Assert
+    assert summary["db_queries"] == 5
+    assert summary["db_time_ms"] >= 0
+    assert summary["db_n_plus_one"] == ["SELECT * FROM users WHERE id = ?"]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_projected_page_matches_orm_page(test_db: AsyncSession):
+    """Test that the column-projection read builds the same UserRead objects."""
+    # Arrange
+    repository = UserRepository(test_db)
+    await repository.bulk_create([{"name": f"User {i}", "description": None} for i in range(3)])
+
+    # Act
+    orm_rows = await repository.get_page(limit=10)
+    projected = await repository.get_page(limit=10, schema=UserRead)
+
+    # Assert
+    assert projected == [UserRead.model_validate(u) for u in orm_rows]
+    assert all(type(u) is UserRead for u in projected)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_search_by_name_is_ranked_and_uses_the_index(test_db: AsyncSession):
+    """Test prefix search ranking and that SQLite plans it on ix_users_name_lower."""
+    # Arrange
+    repository = UserRepository(test_db)
+    await repository.bulk_create([
+        {"name": name, "description": None}
+        for name in ("Annabelle", "Ann", "Bob", "anna", "Joanna")
+    ])
+
+    # Act
+    results = await repository.search_by_name("ANN", limit=10, schema=UserRead)
+    plan = await test_db.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM users WHERE lower(name) >= 'ann' AND lower(name) < 'ann\U0010ffff'"
+    ))
+
+    # Assert
+    assert [u.name for u in results] == ["Ann", "anna", "Annabelle"]
+    assert "ix_users_name_lower" in " ".join(row[-1] for row in plan)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_transactional_calls_join_the_ambient_unit_of_work(test_db: AsyncSession):
+    """Test that nested @transactional calls share the owner's session, with savepoints."""
+    # Arrange
+    sessions = []
+
+    @transactional()
+    async def add_user(name: str, session=None):
+        sessions.append(session)
+        session.add(User(name=name))
+        await session.flush()
+
+    @transactional(savepoint=True)
+    async def add_user_then_fail(name: str, session=None):
+        await add_user(name)
+        raise ValueError("rejected")
+
+    token = set_unit_of_work(UnitOfWork(test_db))
+
+    try:
+        # Act
+        await add_user("kept")
+        with pytest.raises(ValueError):
+            await add_user_then_fail("rolled back")
+    finally:
+        reset_unit_of_work(token)
+    names = [u.name for u in await UserRepository(test_db).get_all()]
+
+    # Assert
+    assert sessions == [test_db, test_db]
+    assert names == ["kept"]
+    assert test_db.in_transaction()  # the owner commits, not the decorated calls
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_write_coalescer_batches_concurrent_inserts(primary_and_replica):
+    """Test one INSERT for a burst of rows, with per-row errors."""
+    # Arrange
+    engine = primary_and_replica[0]
+    coalescer = WriteCoalescer(User, async_sessionmaker(engine, expire_on_commit=False), max_batch=50, max_delay=0.01)
+    inserts = []
+    listener = lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT") else None
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+
+    try:
+        # Act
+        good = await asyncio.gather(*(coalescer.insert({"name": f"User {i}"}) for i in range(10)))
+        inserts_for_good_batch = len(inserts)
+        mixed = await asyncio.gather(
+            coalescer.insert({"name": "ok"}),
+            coalescer.insert({"name": None}),
+            return_exceptions=True,
+        )
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", listener)
+        await coalescer.close()
+
+    # Assert
+    assert [u.name for u in good] == [f"User {i}" for i in range(10)]
+    assert len({u.id for u in good}) == 10
+    assert inserts_for_good_batch == 1
+    assert mixed[0].name == "ok" and mixed[0].id is not None
+    assert isinstance(mixed[1], IntegrityError)